@@ -33,42 +33,120 @@ from src.ai.music_ai import MusicAI
 
 # Librerías estándar
 import asyncio
+import hashlib
+import importlib
+import importlib.util
+import sysconfig
 import threading
 from pathlib import Path
 import logging
+import logging.handlers
 import webbrowser
 import time
 
 # Configurar logging avanzado sin caracteres especiales
+# El archivo se escribe por lotes: se vuelca al llenarse el buffer, ante un
+# WARNING o superior, o como mucho cada LOG_FLUSH_INTERVAL segundos para
+# que el archivo no se quede atrás respecto a la consola
+LOG_FLUSH_INTERVAL = 2.0
+
+class _PeriodicMemoryHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler que además vuelca periódicamente desde un hilo daemon"""
+    
+    def __init__(self, *args, interval: float = LOG_FLUSH_INTERVAL, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._interval = interval
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="log-flush", daemon=True
+        )
+        self._flusher.start()
+    
+    def _flush_loop(self):
+        while not self._stop.wait(self._interval):
+            self.flush()
+    
+    def close(self):
+        self._stop.set()
+        super().close()
+
+_log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_file_handler = logging.FileHandler('music_player_pro.log', encoding='utf-8')
+_file_handler.setFormatter(_log_format)
+_memory_handler = _PeriodicMemoryHandler(
+    capacity=64,
+    flushLevel=logging.WARNING,
+    target=_file_handler
+)
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(_log_format)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('music_player_pro.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[_memory_handler, _stream_handler]
 )
 logger = logging.getLogger(__name__)
 
+def _deps_marker_path():
+    """Marcador de dependencias verificadas
+    
+    La clave incluye el intérprete y su entorno (sys.executable, sys.prefix),
+    la fecha de requirements.txt y la del site-packages, que cambia al
+    instalar o desinstalar paquetes.
+    """
+    def _mtime(path):
+        try:
+            return int(os.path.getmtime(path))
+        except OSError:
+            return 0
+    
+    key = "|".join((
+        sys.executable,
+        sys.prefix,
+        f"{sys.version_info[0]}.{sys.version_info[1]}",
+        str(_mtime('requirements.txt')),
+        str(_mtime(sysconfig.get_paths()['purelib'])),
+    ))
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return Path('cache') / f".deps_ok_{digest}"
+
+def _mark_deps_ok(marker):
+    """Registra que las dependencias ya se verificaron"""
+    try:
+        marker.parent.mkdir(exist_ok=True)
+        marker.touch()
+    except OSError as e:
+        logger.debug(f"No se pudo escribir el marcador de dependencias: {e}")
+
+def _find_missing_deps(deps):
+    """Devuelve las dependencias que no se pueden importar
+    
+    find_spec solo consulta los finders: no ejecuta el código de los módulos.
+    """
+    importlib.invalidate_caches()
+    missing = []
+    for dep in deps:
+        try:
+            spec = importlib.util.find_spec('PIL.Image' if dep == 'PIL' else dep)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is None:
+            missing.append(dep)
+    return missing
+
 def check_dependencies():
     """Verifica e instala dependencias críticas automáticamente"""
+    # Verificación previa con el mismo entorno y requirements.txt: no repetir
+    marker = _deps_marker_path()
+    if marker.exists():
+        return True
+    
     critical_deps = [
         'vlc', 'librosa', 'numpy', 'matplotlib', 'sqlalchemy', 
         'PIL', 'flask', 'flask_socketio', 'requests'  # Agregadas dependencias web
     ]
     
-    missing_deps = []
-    
-    for dep in critical_deps:
-        try:
-            if dep == 'PIL':
-                __import__('PIL.Image')
-            elif dep == 'flask_socketio':
-                __import__('flask_socketio')
-            else:
-                __import__(dep)
-        except ImportError:
-            missing_deps.append(dep)
+    missing_deps = _find_missing_deps(critical_deps)
     
     if missing_deps:
         logger.warning(f"Dependencias faltantes: {missing_deps}")
@@ -79,12 +157,24 @@ def check_dependencies():
             subprocess.check_call([
                 sys.executable, "-m", "pip", "install", "-r", "requirements.txt"
             ])
-            print(">>> Dependencias instaladas correctamente")
         except subprocess.CalledProcessError:
             print("ERROR instalando dependencias. Ejecuta manualmente:")
             print("pip install -r requirements.txt")
             return False
+        
+        # Comprobar que la instalación resolvió todo antes de marcarlo
+        missing_deps = _find_missing_deps(critical_deps)
+        if missing_deps:
+            logger.error(f"Dependencias aún faltantes tras instalar: {missing_deps}")
+            print("ERROR instalando dependencias. Ejecuta manualmente:")
+            print("pip install -r requirements.txt")
+            return False
+        print(">>> Dependencias instaladas correctamente")
+        
+        # La instalación cambió site-packages: recalcular la clave
+        marker = _deps_marker_path()
     
+    _mark_deps_ok(marker)
     return True
 
 def initialize_directories():
@@ -114,25 +204,21 @@ def main():
         async def init_components():
             logger.info("Inicializando componentes del sistema...")
             
-            # 1. Gestor de configuración
-            config_manager = ConfigManager()
-            await config_manager.load_config()
-            
-            # 2. Base de datos
-            db_manager = DatabaseManager()
-            await db_manager.initialize()
+            # Construcción de los componentes (barata)
+            config_manager = ConfigManager()        # 1. Gestor de configuración
+            db_manager = DatabaseManager()          # 2. Base de datos
+            audio_engine = VLCAudioEngine()         # 3. Motor de audio VLC
+            visual_manager = VisualEffectsManager() # 4. Gestor de efectos visuales
+            music_ai = MusicAI()                    # 5. IA musical
             
-            # 3. Motor de audio VLC
-            audio_engine = VLCAudioEngine()
-            await audio_engine.initialize()
-            
-            # 4. Gestor de efectos visuales
-            visual_manager = VisualEffectsManager()
-            await visual_manager.initialize()
-            
-            # 5. IA musical
-            music_ai = MusicAI()
-            await music_ai.initialize()
+            # Inicialización concurrente: no dependen entre sí
+            await asyncio.gather(
+                config_manager.load_config(),
+                db_manager.initialize(),
+                audio_engine.initialize(),
+                visual_manager.initialize(),
+                music_ai.initialize()
+            )
             
             # 6. Aplicación principal (versión web integrada)
             app = MusicPlayerProApp(
@@ -25,23 +25,115 @@ except ImportError:
     LIBROSA_AVAILABLE = False
     print("⚠️  Librosa no disponible - análisis de espectro limitado")
 
+try:
+    import soundfile as sf
+    from scipy.signal import resample_poly
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+try:
+    # FFT de Intel MKL (solo si está instalada; más rápida para N pequeños en x86)
+    from mkl_fft._numpy_fft import rfft as _mkl_rfft
+    MKL_FFT_AVAILABLE = True
+except ImportError:
+    MKL_FFT_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import os
+import queue
 import threading
 import time
 import numpy as np
+from pathlib import Path
 from typing import Optional, Dict, List, Callable
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Caché en disco del audio decodificado para análisis (float32, .npy)
+_ANALYSIS_CACHE_DIR = Path("cache") / "analysis"
+_ANALYSIS_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Tamaño fijo de la FFT del análisis en tiempo real
+_FFT_SIZE = 128
+
+# FFT real: MKL si está presente; si no, pocketfft de scipy, que guarda los
+# planes entre llamadas y puede sobrescribir la entrada (siempre es una
+# matriz temporal). Con N=128 lanzar hilos cuesta más que la propia FFT,
+# así que se fija un solo worker
+if MKL_FFT_AVAILABLE:
+    _rfft = _mkl_rfft
+elif LIBROSA_AVAILABLE:
+    _rfft = functools.partial(scipy.fft.rfft, overwrite_x=True, workers=1)
+else:
+    _rfft = np.fft.rfft
+
+if NUMBA_AVAILABLE:
+    # Firmas explícitas: se compilan al importar y el primer frame no espera al JIT
+    
+    @njit("void(float32[:], float64, uint64[:], float32[:], float32[:], float32[:])",
+          cache=True, fastmath=True)
+    def _sim_spectrum_kernel(out, t, state, env_bass, env_mid, env_high):
+        """Espectro simulado (graves + medios + agudos + ruido) en una pasada
+        
+        El ruido sale de un LCG de 64 bits cuyo estado persiste en ``state``
+        (array de un elemento), sin pasar por np.random ni reservar memoria.
+        """
+        bass_amp = 0.6 + 0.4 * np.sin(t * 2)
+        mids_amp = 0.4 + 0.3 * np.sin(t * 3 + 1)
+        highs_amp = 0.3 + 0.2 * np.sin(t * 4 + 2)
+        s = state[0]
+        for i in range(out.size):
+            s = s * np.uint64(6364136223846793005) + np.uint64(1)
+            r = ((s >> np.uint64(32)) & np.uint64(0xFFFFFF)) * (1.0 / 16777216.0)
+            v = (env_bass[i] * bass_amp
+                 + env_mid[i] * mids_amp
+                 + env_high[i] * highs_amp
+                 + r * 0.05)
+            out[i] = 0.0 if v < 0.0 else (1.0 if v > 1.0 else v)
+        state[0] = s
+    
+    @njit("void(float32[:, :], float32[:, :])", cache=True, fastmath=True)
+    def _post_fft_kernel(spectra, out):
+        """Por cada frame: normaliza por el máximo, pasa a escala log y recorta a 0-1"""
+        for r in range(spectra.shape[0]):
+            max_val = 0.0
+            for i in range(spectra.shape[1]):
+                if spectra[r, i] > max_val:
+                    max_val = spectra[r, i]
+            scale = 1.0 / max_val if max_val > 1e-10 else 1.0
+            for i in range(spectra.shape[1]):
+                x = (np.log10(spectra[r, i] * scale + 1e-6) + 6.0) * (1.0 / 6.0)  # -6 a 0 -> 0 a 1
+                out[r, i] = 0.0 if x < 0.0 else (1.0 if x > 1.0 else x)
+
 class VLCAudioEngine:
     """Motor de audio profesional basado en VLC"""
     
+    # Duraciones recordadas por ruta (evita volver a parsear pistas ya vistas)
+    DURATION_CACHE_SIZE = 256
+    
+    # Frames del anillo de espectro (potencia de 2 para indexar con máscara)
+    SPECTRUM_RING_SIZE = 4
+    
     def __init__(self):
         self.instance = None
         self.player = None
         self.media = None
+        self._media_path: Optional[str] = None  # Ruta de la media asignada al player
+        self._duration_cache: Dict[str, float] = {}
         self.equalizer = None
+        self._preset_cache: Optional[tuple] = None  # Nombres de presets (fijos por instalación)
+        self._preset_indices: Dict[str, int] = {}
         
         # Estados
         self.is_playing = False
@@ -59,19 +151,77 @@ class VLCAudioEngine:
         # Callbacks
         self.position_callback: Optional[Callable] = None
         self.end_reached_callback: Optional[Callable] = None
+        # Recibe una vista de solo lectura de una ranura del anillo, válida
+        # solo durante la llamada: quien quiera conservarla debe copiarla
         self.spectrum_callback: Optional[Callable] = None
         
-        # Análisis de espectro
-        self.spectrum_data = np.zeros(512)
-        self.spectrum_thread = None
+        # Análisis de espectro: anillo SPSC de frames float32. El productor
+        # escribe en la ranura siguiente y luego avanza la cabeza; el lector
+        # solo toma la última ranura publicada (sin locks)
+        self._ring = np.zeros((self.SPECTRUM_RING_SIZE, 512), dtype=np.float32)
+        self._ring_head = 0  # Frames publicados (solo lo escribe el productor)
+        self._ring_views = tuple(self._readonly_view(slot) for slot in self._ring)
+        self._hann = np.hanning(_FFT_SIZE).astype(np.float32)
+        
+        # STFT precalculada del fragmento analizado: (frames listos de 512
+        # puntos, salto en muestras, muestras del fragmento); None sin audio real
+        self._stft: Optional[tuple] = None
+        
+        # Interpolación lineal fija de los bins de la FFT a 512 puntos:
+        # índice inferior/superior y peso de cada punto, calculados una vez
+        n_bins = _FFT_SIZE // 2
+        x_new = np.linspace(0, n_bins - 1, 512)
+        self._interp_lo = np.floor(x_new).astype(np.intp)
+        self._interp_hi = np.minimum(self._interp_lo + 1, n_bins - 1)
+        self._interp_frac = (x_new - self._interp_lo).astype(np.float32)
+        
+        # Ruido del espectro simulado: estado del LCG del kernel Numba y, sin
+        # Numba, un bloque precalculado que se recorre con paso primo
+        self._sim_state = np.array([time.time_ns() | 1], dtype=np.uint64)
+        self._noise_pool = np.random.random(8192).astype(np.float32) * 0.05
+        self._noise_off = 0
+        
+        # Envolventes fijas de graves, medios y agudos del espectro simulado
+        f = np.linspace(0, 1, 512, dtype=np.float32)
+        self._env_bass = np.exp(-f * 5).astype(np.float32)
+        self._env_mid = np.exp(-(f - 0.3) ** 2 * 8).astype(np.float32)
+        self._env_high = np.exp(-(f - 0.8) ** 2 * 15).astype(np.float32)
+        
+        self.spectrum_task: Optional[asyncio.Task] = None
         self.spectrum_running = False
+        self._spectrum_gen = 0  # Generación de la cadena de frames activa
+        self._spectrum_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # Loop de la aplicación
+        # Duración real conocida. threading.Event y no asyncio.Event: se espera
+        # desde loops distintos (app y peticiones de Flask) y lo activa el hilo de VLC
+        self._metadata_ready = threading.Event()
+        self._metadata_ready.set()  # Sin carga en curso
         
         # Variables para análisis de audio real
         self.current_audio_path = None
         self.audio_data = None
         self.sample_rate = 22050
         self.audio_loaded = False
-        self.background_task = None  # Track del task de carga en background
+        
+        # Worker único de análisis: la cola guarda solo la última pista pedida
+        self._analysis_queue: queue.Queue = queue.Queue(maxsize=1)
+        self._analysis_thread = threading.Thread(
+            target=self._analysis_worker,
+            name="vlc-audio-analysis",
+            daemon=True
+        )
+        self._analysis_thread.start()
+        
+        # Executor propio para las llamadas a VLC de los métodos async: pocas
+        # hebras fijas que no compiten con el executor por defecto del loop
+        self._exec = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2,
+            thread_name_prefix="vlc"
+        )
+        
+        # Volumen pendiente de aplicar al reproductor (debounce del slider)
+        self._pending_volume = self.volume
+        self._volume_timer: Optional[threading.Timer] = None
         
         # Lock para thread safety
         self._lock = threading.Lock()
@@ -81,6 +231,9 @@ class VLCAudioEngine:
         try:
             logger.info("Inicializando motor de audio VLC...")
             
+            # Loop de la aplicación: aquí se programan los frames del espectro
+            self._loop = asyncio.get_running_loop()
+            
             # Crear instancia VLC con opciones SÚPER OPTIMIZADAS para fluidez
             vlc_args = [
                 '--intf=dummy',           # Sin interfaz
@@ -131,6 +284,12 @@ class VLCAudioEngine:
             vlc.EventType.MediaPlayerTimeChanged,
             self._on_time_changed
         )
+        
+        # Evento de duración conocida (cuando el parseo previo no la obtuvo)
+        event_manager.event_attach(
+            vlc.EventType.MediaPlayerLengthChanged,
+            self._on_length_changed
+        )
     
     def _initialize_equalizer(self):
         """Inicializa el ecualizador de 10 bandas"""
@@ -144,6 +303,9 @@ class VLCAudioEngine:
             # Aplicar al reproductor
             self.player.set_equalizer(self.equalizer)
             
+            # Los presets son fijos para la instalación de VLC: leerlos una vez
+            self._load_equalizer_presets()
+            
             logger.info("✅ Ecualizador inicializado")
             
         except Exception as e:
@@ -159,6 +321,7 @@ class VLCAudioEngine:
             
             # Marcar como cargando ANTES del lock para evitar condiciones de carrera
             self.is_loading = True
+            self._metadata_ready.clear()
             
             try:
                 # Cancelar tareas inmediatamente sin lock
@@ -178,24 +341,37 @@ class VLCAudioEngine:
                     except Exception as e:
                         logger.debug(f"Error deteniendo player: {e}")
                     
-                    # Crear nueva media inmediatamente
-                    self.media = self.instance.media_new(file_path)
-                    self.player.set_media(self.media)
+                    # Misma pista ya cargada: reutilizar la media (ya parseada)
+                    same_media = self.media is not None and file_path == self._media_path
+                    if not same_media:
+                        # Crear nueva media inmediatamente
+                        self.media = self.instance.media_new(file_path)
+                        self.player.set_media(self.media)
+                        self._media_path = file_path
                 
                 # Obtener duración FUERA del lock para no bloquear
-                self._get_duration_sync()
+                metadata_ready = True
+                if not same_media:
+                    cached_duration = self._duration_cache.get(file_path)
+                    if cached_duration is not None:
+                        self.duration = cached_duration
+                    elif self._get_duration_sync():
+                        if len(self._duration_cache) >= self.DURATION_CACHE_SIZE:
+                            # Descartar la entrada más antigua
+                            del self._duration_cache[next(iter(self._duration_cache))]
+                        self._duration_cache[file_path] = self.duration
+                    else:
+                        # Duración por defecto: la real llega con MediaPlayerLengthChanged
+                        metadata_ready = False
+                
+                if metadata_ready:
+                    self._metadata_ready.set()
                 
                 logger.info(f"✅ Pista cargada: {file_path}")
                 
-                # Programar análisis background solo si es necesario
+                # Encolar análisis background solo si es necesario
                 if self.current_audio_path != file_path or not self.audio_loaded:
-                    try:
-                        loop = asyncio.get_running_loop()
-                        if loop and not loop.is_closed():
-                            # Crear task sin await para no bloquear
-                            loop.create_task(self._schedule_background_analysis(file_path))
-                    except (RuntimeError, AttributeError):
-                        pass  # Ignorar errores de loop
+                    self._enqueue_analysis(file_path)
                 
                 return True
                 
@@ -207,146 +383,81 @@ class VLCAudioEngine:
             self.is_loading = False
             return False
     
-    async def _schedule_background_analysis(self, file_path: str):
-        """Programa análisis de background de forma ultra-segura"""
-        try:
-            # Verificación mínima del loop
-            try:
-                loop = asyncio.get_running_loop()
-                if not loop or loop.is_closed():
-                    return
-            except RuntimeError:
-                return
-            
-            # Crear task sin verificaciones complejas
-            try:
-                self.background_task = loop.create_task(
-                    self._load_audio_for_analysis_background(file_path)
-                )
-                
-                # Callback minimalista
-                def minimal_callback(task):
-                    try:
-                        if not task.cancelled() and task.exception():
-                            logger.debug(f"Background task error: {task.exception()}")
-                    except Exception:
-                        pass
-                
-                self.background_task.add_done_callback(minimal_callback)
-                
-            except Exception as e:
-                logger.debug(f"Error creando task: {e}")
-            
-        except Exception as e:
-            logger.debug(f"Error en schedule: {e}")
-
-    async def _load_audio_for_analysis_background(self, file_path: str):
-        """Carga audio en background SÚPER SIMPLIFICADO Y RESISTENTE"""
+    def _enqueue_analysis(self, item: Optional[str]):
+        """Encola una pista para el worker reemplazando la pendiente, si la hay"""
         try:
-            # Verificación robusta del loop
-            try:
-                loop = asyncio.get_running_loop()
-                if not loop or loop.is_closed():
-                    logger.debug("Loop cerrado en background analysis")
-                    return
-            except RuntimeError:
-                logger.debug("No hay loop en background analysis")
-                return
-            
-            # Pausa mínima con verificación de cancelación
+            self._analysis_queue.put_nowait(item)
+        except queue.Full:
             try:
-                await asyncio.sleep(0.05)
-            except asyncio.CancelledError:
-                self.audio_loaded = False
-                return
-            
-            # Verificar cancelación de forma más robusta
-            if hasattr(self, 'background_task') and self.background_task and self.background_task.cancelled():
-                logger.debug("Background task cancelado")
-                return
-            
-            # Verificar que el loop sigue activo antes de continuar
+                self._analysis_queue.get_nowait()
+            except queue.Empty:
+                pass
             try:
-                current_loop = asyncio.get_running_loop()
-                if not current_loop or current_loop.is_closed():
-                    logger.debug("Loop cerrado durante análisis")
-                    return
-            except RuntimeError:
-                logger.debug("Loop no disponible durante análisis")
-                return
+                self._analysis_queue.put_nowait(item)
+            except queue.Full:
+                pass  # Otro productor se adelantó; su pista es igual de reciente
+    
+    def _analysis_worker(self):
+        """Hilo de análisis: carga el audio de cada pista encolada (None termina)"""
+        while True:
+            file_path = self._analysis_queue.get()
+            if file_path is None:
+                break
             
-            # Cargar datos reales con mejor manejo de errores
             try:
-                await self._load_audio_for_analysis(file_path)
+                self._load_audio_for_analysis(file_path)
             except Exception as e:
-                logger.debug(f"Error en load_audio_for_analysis: {e}")
+                logger.debug(f"Error en análisis background: {e}")
                 self.audio_loaded = False
-                return
-            
-            # Verificación final antes de marcar como cargado
-            if (self.audio_loaded and 
-                hasattr(self, 'background_task') and 
-                self.background_task and 
-                not self.background_task.cancelled()):
-                logger.info("🎵 Análisis real activado")
-            
-        except asyncio.CancelledError:
-            # Normal cuando se cancela
-            logger.debug("Background analysis cancelado")
-            self.audio_loaded = False
-            raise
-        except Exception as e:
-            # Cualquier otro error - usar datos simulados
-            logger.debug(f"Error en análisis background: {e}")
-            self.audio_loaded = False
     
-    def _get_duration_sync(self):
-        """Obtiene la duración de la pista actual (versión síncrona optimizada)"""
+    def _get_duration_sync(self) -> bool:
+        """Obtiene la duración de la pista actual (versión síncrona optimizada)
+        
+        El parseo de VLC es asíncrono: en lugar de sondear con sleeps se
+        espera al evento MediaParsedChanged, y solo si la duración no está
+        disponible de inmediato. Devuelve False si se usó la duración por
+        defecto.
+        """
         try:
-            # Parse la media para obtener información
-            self.media.parse()
+            parsed = threading.Event()
             
-            # Intentar obtener duración inmediatamente
-            duration = self.media.get_duration()
-            if duration > 0:
-                self.duration = duration / 1000.0
-                logger.debug(f"🕒 Duración obtenida inmediatamente: {self.duration:.1f}s")
-                return
+            def on_parsed(event):
+                parsed.set()
             
-            # Si no se obtiene inmediatamente, esperar brevemente con timeout corto
-            timeout = 10  # Reducido a 1 segundo máximo
-            while timeout > 0:
+            event_manager = self.media.event_manager()
+            event_manager.event_attach(vlc.EventType.MediaParsedChanged, on_parsed)
+            
+            try:
+                # Parse local (sin red) con timeout de 500 ms
+                self.media.parse_with_options(vlc.MediaParseFlag.local, 500)
+                
+                # Intentar obtener duración inmediatamente
                 duration = self.media.get_duration()
                 if duration > 0:
                     self.duration = duration / 1000.0
-                    logger.debug(f"🕒 Duración obtenida tras espera: {self.duration:.1f}s")
-                    break
-                time.sleep(0.1)
-                timeout -= 1
+                    logger.debug(f"🕒 Duración obtenida inmediatamente: {self.duration:.1f}s")
+                    return True
+                
+                # Esperar la notificación de parseo terminado
+                if parsed.wait(0.5):
+                    duration = self.media.get_duration()
+            finally:
+                event_manager.event_detach(vlc.EventType.MediaParsedChanged)
+            
+            if duration > 0:
+                self.duration = duration / 1000.0
+                logger.debug(f"🕒 Duración obtenida tras parseo: {self.duration:.1f}s")
+                return True
             
             # Si aún no se obtiene, usar duración por defecto
-            if self.duration <= 0:
-                self.duration = 180.0  # 3 minutos por defecto
-                logger.warning(f"⚠️ Usando duración por defecto: {self.duration:.1f}s")
+            self.duration = 180.0  # 3 minutos por defecto
+            logger.warning(f"⚠️ Usando duración por defecto: {self.duration:.1f}s")
+            return False
                 
         except Exception as e:
             logger.warning(f"Error obteniendo duración: {e}")
             self.duration = 180.0  # Fallback
-    
-    async def _get_duration(self):
-        """Obtiene la duración de la pista actual (versión async)"""
-        # Parse la media para obtener información
-        self.media.parse()
-        
-        # Esperar a que se obtenga la duración
-        timeout = 50  # 5 segundos
-        while timeout > 0:
-            duration = self.media.get_duration()
-            if duration > 0:
-                self.duration = duration / 1000.0  # Convertir a segundos
-                break
-            await asyncio.sleep(0.1)
-            timeout -= 1
+            return False
     
     def play(self) -> bool:
         """Inicia la reproducción"""
@@ -428,64 +539,70 @@ class VLCAudioEngine:
     
     def _cancel_background_tasks_sync(self):
         """Cancela tareas de background INMEDIATAMENTE sin esperas"""
+        # Descartar el análisis pendiente (el que está en curso se descarta al terminar)
         try:
-            # Cancelar task principal de forma instantánea
-            if hasattr(self, 'background_task') and self.background_task:
-                try:
-                    if not self.background_task.done():
-                        self.background_task.cancel()
-                except Exception:
-                    pass  # Ignorar errores
-                self.background_task = None
-            
-            # Cancelar task de espectro de forma instantánea
-            if hasattr(self, 'spectrum_task') and self.spectrum_task:
-                try:
-                    if not self.spectrum_task.done():
-                        self.spectrum_task.cancel()
-                except Exception:
-                    pass  # Ignorar errores
-                self.spectrum_task = None
-                    
-        except Exception:
-            pass  # Ignorar cualquier error para máxima velocidad
+            self._analysis_queue.get_nowait()
+        except queue.Empty:
+            pass
         
-        # Limpiar referencias SIEMPRE
-        self.background_task = None
-        if hasattr(self, 'spectrum_task'):
-            self.spectrum_task = None
+        # Cancelar task de espectro de forma instantánea
+        task, self.spectrum_task = self.spectrum_task, None
+        if task is not None and not task.done():
+            task.cancel()
     
     def seek(self, position: float) -> bool:
         """Busca una posición específica (0.0 - 1.0)"""
         try:
-            with self._lock:
-                # Asegurar que el valor esté entre 0.0 y 1.0
-                position = max(0.0, min(1.0, position))
-                self.player.set_position(position)
-                self.current_position = position * self.duration
-                
-                logger.info(f"⏭️ Seek a posición: {position:.2%}")
-                return True
+            # Sin lock: set_position es thread-safe en libvlc y no hay
+            # invariantes entre campos que proteger
+            position = max(0.0, min(1.0, position))
+            self.player.set_position(position)
+            self.current_position = position * self.duration
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"⏭️ Seek a posición: {position:.2%}")
+            return True
                 
         except Exception as e:
             logger.error(f"Error en seek: {e}")
             return False
     
     def set_volume(self, volume: int) -> bool:
-        """Establece el volumen (0-100)"""
+        """Establece el volumen (0-100)
+        
+        El valor se aplica a VLC tras una breve espera; las llamadas que
+        llegan mientras tanto solo actualizan el valor pendiente.
+        """
         try:
+            volume = max(0, min(100, volume))
+            self.volume = volume
+            
+            # El lock solo cubre el traspaso valor pendiente/timer con _apply_volume
             with self._lock:
-                volume = max(0, min(100, volume))
-                self.player.audio_set_volume(volume)
-                self.volume = volume
-                
-                logger.info(f"🔊 Volumen: {volume}%")
-                return True
+                self._pending_volume = volume
+                if self._volume_timer is None:
+                    self._volume_timer = threading.Timer(0.015, self._apply_volume)
+                    self._volume_timer.daemon = True
+                    self._volume_timer.start()
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"🔊 Volumen: {volume}%")
+            return True
                 
         except Exception as e:
             logger.error(f"Error estableciendo volumen: {e}")
             return False
     
+    def _apply_volume(self):
+        """Aplica al reproductor el último volumen solicitado"""
+        try:
+            with self._lock:
+                self._volume_timer = None
+                volume = self._pending_volume
+            self.player.audio_set_volume(volume)
+        except Exception as e:
+            logger.error(f"Error aplicando volumen: {e}")
+    
     def set_equalizer_band(self, band: int, gain: float) -> bool:
         """Establece ganancia de una banda del ecualizador"""
         try:
@@ -494,7 +611,8 @@ class VLCAudioEngine:
                 gain = max(-20.0, min(20.0, gain))
                 self.equalizer.set_amp_at_index(gain, band)
                 
-                logger.info(f"🎛️ EQ Band {band}: {gain:.1f}dB")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"🎛️ EQ Band {band}: {gain:.1f}dB")
                 return True
             return False
             
@@ -502,18 +620,23 @@ class VLCAudioEngine:
             logger.error(f"Error en ecualizador: {e}")
             return False
     
+    def _load_equalizer_presets(self):
+        """Lee de VLC los nombres de los presets y su índice"""
+        preset_indices = {}
+        for i in range(vlc.libvlc_audio_equalizer_get_preset_count()):
+            preset_name = vlc.libvlc_audio_equalizer_get_preset_name(i)
+            if preset_name:
+                preset_indices[preset_name.decode('utf-8')] = i
+        
+        self._preset_indices = preset_indices
+        self._preset_cache = tuple(preset_indices)
+    
     def get_equalizer_presets(self) -> List[str]:
         """Obtiene presets disponibles del ecualizador"""
         try:
-            presets = []
-            preset_count = vlc.libvlc_audio_equalizer_get_preset_count()
-            
-            for i in range(preset_count):
-                preset_name = vlc.libvlc_audio_equalizer_get_preset_name(i)
-                if preset_name:
-                    presets.append(preset_name.decode('utf-8'))
-            
-            return presets
+            if self._preset_cache is None:
+                self._load_equalizer_presets()
+            return list(self._preset_cache)
             
         except Exception as e:
             logger.error(f"Error obteniendo presets: {e}")
@@ -522,9 +645,10 @@ class VLCAudioEngine:
     def load_equalizer_preset(self, preset_name: str) -> bool:
         """Carga un preset del ecualizador"""
         try:
-            presets = self.get_equalizer_presets()
-            if preset_name in presets:
-                preset_index = presets.index(preset_name)
+            if self._preset_cache is None:
+                self._load_equalizer_presets()
+            preset_index = self._preset_indices.get(preset_name)
+            if preset_index is not None:
                 
                 # Crear nuevo ecualizador con el preset
                 self.equalizer = vlc.AudioEqualizer.create_from_preset(preset_index)
@@ -539,151 +663,135 @@ class VLCAudioEngine:
             return False
     
     def _start_spectrum_analysis(self):
-        """Inicia el análisis de espectro en tiempo real"""
+        """Inicia el análisis de espectro en tiempo real
+        
+        Los frames se programan con call_later en el loop asyncio de la
+        aplicación; puede llamarse desde cualquier hilo.
+        """
         if not self.spectrum_running:
+            loop = self._loop
+            if loop is None or loop.is_closed():
+                logger.debug("Sin loop asyncio: análisis de espectro desactivado")
+                return
+            
             self.spectrum_running = True
-            self.spectrum_thread = threading.Thread(
-                target=self._spectrum_analysis_loop,
-                daemon=True
-            )
-            self.spectrum_thread.start()
+            self._spectrum_gen += 1
+            loop.call_soon_threadsafe(self._spectrum_tick, self._spectrum_gen)
             logger.info("🎵 Análisis de espectro iniciado")
     
     def _stop_spectrum_analysis(self):
         """Detiene el análisis de espectro INMEDIATAMENTE"""
         self.spectrum_running = False
-        # NO esperar al thread - let it die naturally para cambios instantáneos
-        if self.spectrum_thread and self.spectrum_thread.is_alive():
-            # Solo join si es absolutamente necesario y con timeout mínimo
+        # Invalidar la cadena de frames en curso y cancelar el timer pendiente
+        # desde el hilo del loop (TimerHandle no es thread-safe)
+        self._spectrum_gen += 1
+        handle, self._spectrum_handle = self._spectrum_handle, None
+        if handle is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(handle.cancel)
+    
+    def _spectrum_tick(self, gen: int):
+        """Calcula un frame de espectro y programa el siguiente (20 FPS)"""
+        if gen != self._spectrum_gen or not self.spectrum_running:
+            return
+        if not self.is_playing:
+            self.spectrum_running = False
+            return
+        
+        frame_ns = 50_000_000  # 20 FPS en lugar de 25 para menos carga CPU
+        started = time.monotonic_ns()
+        
+        if self.is_paused:
+            # En pausa no se analiza: revisar con menos frecuencia
+            delay = 0.1
+        elif self.spectrum_callback is None:
+            # Nadie muestra el espectro: no calcular frames hasta que se registre
+            delay = 0.2
+        else:
             try:
-                self.spectrum_thread.join(timeout=0.01)  # 10ms máximo
-            except Exception:
-                pass  # Ignorar errores de join
-        self.spectrum_thread = None
+                self._spectrum_frame()
+            except Exception as e:
+                logger.error(f"Error en análisis de espectro: {e}")
+            elapsed = time.monotonic_ns() - started
+            delay = (frame_ns - elapsed) * 1e-9 if elapsed < frame_ns else 0.0
+        
+        self._spectrum_handle = self._loop.call_later(delay, self._spectrum_tick, gen)
     
-    def _spectrum_analysis_loop(self):
-        """Loop de análisis de espectro OPTIMIZADO PARA FLUIDEZ SIN ENTRECORTES"""
-        frame_time = 1/20  # 20 FPS en lugar de 25 para menos carga CPU
-        last_frame_time = time.time()
+    def _spectrum_frame(self):
+        """Calcula y publica un frame del espectro (real o simulado)"""
+        slot = self._ring[self._ring_head & (self.SPECTRUM_RING_SIZE - 1)]
         
-        while self.spectrum_running and self.is_playing:
+        stft = self._stft
+        if self.audio_loaded and stft is not None:
+            # ✅ ANÁLISIS REAL: frame precalculado de la STFT
             try:
-                # Control de timing más suave
-                current_time = time.time()
-                elapsed = current_time - last_frame_time
-                
-                if elapsed < frame_time:
-                    # Dormir menos tiempo para suavidad
-                    time.sleep(frame_time - elapsed)
-                    continue
-                
-                last_frame_time = current_time
-                
-                # Solo analizar si está reproduciendo y no pausado
-                if self.is_playing and not self.is_paused:
-                    if self.audio_loaded and self.audio_data is not None:
-                        # ✅ ANÁLISIS REAL OPTIMIZADO
-                        try:
-                            # Posición en el audio con menos queries al player
-                            position = self.player.get_position()  # 0.0 - 1.0
-                            
-                            # Calcular frame en el fragmento de 5 segundos
-                            total_frames = len(self.audio_data)
-                            # Ciclar por el fragmento para tener análisis continuo
-                            current_frame = int((position * 10) % 1.0 * total_frames)
-                            
-                            # Ventana MÁS GRANDE para menos cálculos (0.3 segundos)
-                            window_size = int(self.sample_rate * 0.3)  # 0.3 segundos
-                            start_frame = max(0, current_frame - window_size // 2)
-                            end_frame = min(total_frames, start_frame + window_size)
-                            
-                            if end_frame > start_frame and (end_frame - start_frame) > 64:
-                                # Extraer ventana de audio
-                                audio_window = self.audio_data[start_frame:end_frame]
-                                
-                                # FFT optimizada con MENOS resolución
-                                fft_size = min(128, len(audio_window))  # FFT MÁS PEQUEÑA
-                                
-                                if len(audio_window) >= fft_size:
-                                    # Aplicar ventana rápida
-                                    windowed = audio_window[:fft_size] * np.hanning(fft_size)
-                                    
-                                    # FFT real
-                                    fft = np.fft.fft(windowed)
-                                    spectrum = np.abs(fft[:fft_size//2])
-                                    
-                                    # Normalización ultra-rápida
-                                    if len(spectrum) > 0:
-                                        spectrum_max = np.max(spectrum)
-                                        if spectrum_max > 1e-10:
-                                            spectrum = spectrum / spectrum_max
-                                        
-                                        # Escala log rápida
-                                        spectrum = np.log10(spectrum + 1e-6)
-                                        spectrum = (spectrum + 6) / 6  # Normalizar -6 a 0 -> 0 a 1
-                                        spectrum = np.clip(spectrum, 0, 1)
-                                        
-                                        # Resize a 512 súper rápido
-                                        if len(spectrum) != 512:
-                                            x_old = np.linspace(0, 1, len(spectrum))
-                                            x_new = np.linspace(0, 1, 512)
-                                            spectrum = np.interp(x_new, x_old, spectrum)
-                                        
-                                        self.spectrum_data = spectrum
-                                        
-                                        # Callback con try/except para evitar bloqueos
-                                        if self.spectrum_callback:
-                                            try:
-                                                self.spectrum_callback(spectrum)
-                                            except:
-                                                pass
-                                        
-                                        continue
-                        except Exception:
-                            # Si falla el análisis real, usar simulado
-                            pass
-                    
-                    # 🎨 ANÁLISIS SIMULADO FLUIDO - Solo si no hay datos reales
-                    t = time.time()
-                    
-                    # Simular espectro musical realista con MENOS cálculos
-                    freqs = np.linspace(0, 1, 512)
-                    
-                    # Bass (graves) - frecuencias bajas
-                    bass = np.exp(-freqs * 5) * (0.6 + 0.4 * np.sin(t * 2))
-                    
-                    # Mids (medios) - frecuencias medias  
-                    mids = np.exp(-(freqs - 0.3)**2 * 8) * (0.4 + 0.3 * np.sin(t * 3 + 1))
-                    
-                    # Highs (agudos) - frecuencias altas
-                    highs = np.exp(-(freqs - 0.8)**2 * 15) * (0.3 + 0.2 * np.sin(t * 4 + 2))
-                    
-                    # Combinar y agregar variación MÁS RÁPIDA
-                    spectrum = bass + mids + highs
-                    spectrum += np.random.random(512) * 0.05  # MENOS ruido para menos cálculo
-                    spectrum = np.clip(spectrum, 0, 1)
-                    
-                    self.spectrum_data = spectrum
-                    
-                    if self.spectrum_callback:
-                        try:
-                            self.spectrum_callback(spectrum)
-                        except:
-                            pass
-                else:
-                    # Si no está reproduciendo, dormir más tiempo
-                    time.sleep(0.1)
+                frames, hop, total_frames = stft
                 
-            except Exception as e:
-                logger.error(f"Error en spectrum loop: {e}")
-                time.sleep(0.1)  # Evitar loop infinito en caso de error
+                # Posición en el audio con menos queries al player
+                position = self.player.get_position()  # 0.0 - 1.0
                 
-            except Exception as e:
-                logger.error(f"Error en análisis de espectro: {e}")
-                time.sleep(0.1)  # Pausa en caso de error
+                # Ciclar por el fragmento de 5 segundos para tener análisis continuo
+                current_frame = int((position * 10) % 1.0 * total_frames)
+                
+                # Ventana centrada en la posición (0.3 segundos)
+                window_size = int(self.sample_rate * 0.3)
+                start_frame = max(0, current_frame - window_size // 2)
+                np.copyto(slot, frames[min(start_frame // hop, len(frames) - 1)])
+                self._publish_spectrum()
+                return
+            except Exception:
+                # Si falla el análisis real, usar simulado
+                pass
+        
+        # 🎨 ANÁLISIS SIMULADO FLUIDO - Solo si no hay datos reales
+        t = time.monotonic_ns() * 1e-9
+        
+        if NUMBA_AVAILABLE:
+            _sim_spectrum_kernel(slot, t, self._sim_state,
+                                 self._env_bass, self._env_mid, self._env_high)
+        else:
+            # Graves, medios y agudos: envolventes fijas por amplitudes oscilantes
+            spectrum = slot
+            np.multiply(self._env_bass, 0.6 + 0.4 * np.sin(t * 2), out=spectrum)
+            spectrum += self._env_mid * (0.4 + 0.3 * np.sin(t * 3 + 1))
+            spectrum += self._env_high * (0.3 + 0.2 * np.sin(t * 4 + 2))
+            
+            # Variación con ruido precalculado
+            off = self._noise_off
+            spectrum += self._noise_pool[off:off + 512]
+            self._noise_off = (off + 17) % (len(self._noise_pool) - 512)
+            np.clip(spectrum, 0, 1, out=spectrum)
+        
+        self._publish_spectrum()
     
-    async def _load_audio_for_analysis(self, file_path: str):
-        """Carga el archivo de audio para análisis de espectro - SÚPER OPTIMIZADO Y REAL"""
+    def _publish_spectrum(self):
+        """Publica la ranura recién escrita y notifica al callback"""
+        idx = self._ring_head & (self.SPECTRUM_RING_SIZE - 1)
+        
+        # Avanzar la cabeza después de escribir: el lector ve un frame completo
+        self._ring_head += 1
+        
+        # Callback con try/except para evitar bloqueos. La vista es de solo
+        # lectura y la ranura se reescribe SPECTRUM_RING_SIZE frames después
+        if self.spectrum_callback:
+            try:
+                self.spectrum_callback(self._ring_views[idx])
+            except:
+                pass
+    
+    @staticmethod
+    def _readonly_view(array: np.ndarray) -> np.ndarray:
+        """Vista de solo lectura sobre ``array`` (sin copia)"""
+        view = array.view()
+        view.flags.writeable = False
+        return view
+    
+    @property
+    def spectrum_data(self) -> np.ndarray:
+        """Último frame de espectro publicado"""
+        return self._ring[(self._ring_head - 1) & (self.SPECTRUM_RING_SIZE - 1)]
+    
+    def _load_audio_for_analysis(self, file_path: str):
+        """Carga el archivo de audio para análisis de espectro (en el hilo de análisis)"""
         try:
             # Evitar cargar el mismo archivo dos veces
             if self.current_audio_path == file_path and self.audio_loaded:
@@ -693,21 +801,47 @@ class VLCAudioEngine:
             if LIBROSA_AVAILABLE:
                 logger.info("🎵 Cargando audio para análisis de espectro...")
                 
-                # Cargar audio ULTRA OPTIMIZADO - solo 5 segundos pero REAL
-                def load_audio_super_fast():
+                # Solo 5 segundos desde el minuto 1 (parte más representativa)
+                duration = 5.0     # 5 segundos es suficiente
+                offset = 60.0      # Comenzar en el minuto 1 (mejor parte)
+                sr_target = 8000   # Sample rate muy bajo para velocidad máxima
+                
+                cache_path = self._analysis_cache_path(file_path, sr_target)
+                audio, sr = None, None
+                
+                # Caché en disco: se mapea sin copiar ni volver a decodificar
+                if cache_path is not None and cache_path.exists():
+                    try:
+                        audio = np.load(cache_path, mmap_mode='r')
+                        sr = sr_target
+                        os.utime(cache_path)  # Marcar como usado recientemente (LRU)
+                        logger.debug(f"Audio de análisis leído de caché: {cache_path.name}")
+                    except Exception as e:
+                        logger.debug(f"Caché de análisis inválida: {e}")
+                        audio, sr = None, None
+                
+                from_cache = audio is not None
+                
+                # Lectura directa con soundfile (WAV/FLAC/OGG): seek sin decodificar
+                # lo anterior al offset
+                if audio is None and SOUNDFILE_AVAILABLE:
+                    audio = self._read_clip_soundfile(file_path, offset, duration, sr_target)
+                    if audio is not None and len(audio) < sr_target:
+                        # Si no hay suficiente audio en el minuto 1, probar desde el inicio
+                        audio = self._read_clip_soundfile(file_path, 0.0, duration, sr_target)
+                    if audio is not None:
+                        sr = sr_target
+                
+                if audio is None:
                     try:
-                        # Solo 5 segundos desde el minuto 1 (parte más representativa)
-                        duration = 5.0     # 5 segundos es suficiente
-                        offset = 60.0      # Comenzar en el minuto 1 (mejor parte)
-                        sr_target = 8000   # Sample rate muy bajo para velocidad máxima
-                        
                         audio, sr = librosa.load(
                             file_path, 
                             sr=sr_target,
                             mono=True,
                             duration=duration,
                             offset=offset,
-                            res_type='kaiser_fast'  # Resample más rápido
+                            dtype=np.float32,
+                            res_type='polyphase'  # Resample polifásico (rápido, suficiente para visualizar)
                         )
                         
                         # Si no hay suficiente audio en el minuto 1, probar desde el inicio
@@ -718,45 +852,36 @@ class VLCAudioEngine:
                                 mono=True,
                                 duration=duration,
                                 offset=0.0,  # Desde el inicio
-                                res_type='kaiser_fast'
+                                dtype=np.float32,
+                                res_type='polyphase'
                             )
-                        
-                        return audio, sr
                     except Exception as e:
                         logger.error(f"Error cargando audio con librosa: {e}")
-                        return None, None
-                
-                # Ejecutar SÚPER RÁPIDO con mejor manejo de errores
-                try:
-                    loop = asyncio.get_running_loop()
-                    if not loop or loop.is_closed():
-                        logger.debug("⚠️ Loop cerrado durante carga de audio")
                         audio, sr = None, None
-                    else:
-                        # Timeout súper corto - 0.5 segundos máximo
-                        audio, sr = await asyncio.wait_for(
-                            loop.run_in_executor(None, load_audio_super_fast),
-                            timeout=0.5
-                        )
-                except asyncio.TimeoutError:
-                    logger.debug("⚠️ Timeout carga rápida - fallback simulado")
-                    audio, sr = None, None
-                except RuntimeError as e:
-                    if "Event loop is closed" in str(e):
-                        logger.debug("⚠️ Loop cerrado - fallback simulado")
-                    else:
-                        logger.debug(f"⚠️ RuntimeError: {e} - fallback simulado")
-                    audio, sr = None, None
-                except Exception as e:
-                    logger.debug(f"⚠️ Error inesperado: {e} - fallback simulado")
-                    audio, sr = None, None
                 
-                if audio is not None and len(audio) > 0:
+                if not from_cache and audio is not None and len(audio) > 0 and cache_path is not None:
+                    self._store_analysis_cache(cache_path, audio)
+                
+                # Si mientras tanto se pidió otra pista, este resultado ya no sirve
+                if not self._analysis_queue.empty():
+                    logger.debug("Análisis descartado: hay una pista más reciente")
+                    return
+                
+                if audio is not None and len(audio) >= _FFT_SIZE:
+                    # float32 contiguo: la ventana y la FFT usan la ruta FP32 de
+                    # pocketfft (no copia si ya lo es, como el mmap de la caché)
+                    audio = np.ascontiguousarray(audio, dtype=np.float32)
+                    
+                    # Todos los frames de una vez: el loop de espectro solo indexa
+                    stft = self._compute_stft(audio, sr)
+                    
                     self.audio_data = audio
                     self.sample_rate = sr
+                    self._stft = stft
                     self.current_audio_path = file_path
                     self.audio_loaded = True
-                    logger.info(f"✅ Audio real cargado (súper-rápido): {len(audio)} samples a {sr}Hz")
+                    logger.info(f"✅ Audio real cargado: {len(audio)} samples a {sr}Hz, "
+                                f"{len(stft[0])} frames de espectro")
                 else:
                     self.audio_loaded = False
                     self.sample_rate = 8000  # Fallback sample rate
@@ -771,6 +896,106 @@ class VLCAudioEngine:
             self.audio_loaded = False
             self.sample_rate = 8000
     
+    def _read_clip_soundfile(self, file_path: str, offset: float, duration: float,
+                             sr_target: int) -> Optional[np.ndarray]:
+        """Lee un fragmento mono con soundfile y lo remuestrea a sr_target
+        
+        Devuelve None si soundfile no soporta el formato (p. ej. MP3 en
+        libsndfile antiguo) para que se use librosa.
+        """
+        try:
+            with sf.SoundFile(file_path) as f:
+                f.seek(min(int(offset * f.samplerate), max(0, f.frames - 1)))
+                data = f.read(int(duration * f.samplerate), dtype='float32', always_2d=False)
+                if f.channels > 1:
+                    data = data.mean(axis=1)
+                if f.samplerate != sr_target:
+                    data = resample_poly(data, sr_target, f.samplerate)
+                return np.asarray(data, dtype=np.float32)
+        except Exception as e:
+            logger.debug(f"soundfile no pudo leer {file_path}: {e}")
+            return None
+    
+    def _compute_stft(self, audio: np.ndarray, sample_rate: int) -> tuple:
+        """Precalcula el espectro visual (512 puntos) de todo el fragmento
+        
+        Frames de _FFT_SIZE muestras con salto de ~25 ms, procesados igual
+        que el análisis por frame: Hann, rfft, normalización por frame,
+        escala log 0-1 e interpolación a 512 puntos.
+        """
+        hop = max(1, sample_rate // 40)
+        windows = np.lib.stride_tricks.sliding_window_view(audio, _FFT_SIZE)[::hop]
+        
+        windowed = windows * self._hann  # Copia propia: la FFT puede sobrescribirla
+        bins = _rfft(windowed, axis=1)[:, :_FFT_SIZE // 2]
+        
+        # Magnitud aproximada alpha-max + beta-min (sin raíz cuadrada); el
+        # error (<~8%) no se aprecia tras normalizar y pasar a escala log
+        re = np.abs(bins.real).astype(np.float32)
+        im = np.abs(bins.imag).astype(np.float32)
+        spectra = np.maximum(re, im)
+        np.minimum(re, im, out=re)
+        re *= 0.4
+        spectra += re
+        
+        if NUMBA_AVAILABLE:
+            _post_fft_kernel(spectra, spectra)
+        else:
+            peak = spectra.max(axis=1, keepdims=True)
+            spectra /= np.where(peak > 1e-10, peak, 1.0)
+            np.log10(spectra + 1e-6, out=spectra)
+            spectra += 6
+            spectra /= 6  # Normalizar -6 a 0 -> 0 a 1
+            np.clip(spectra, 0, 1, out=spectra)
+        
+        lo = spectra[:, self._interp_lo]
+        frames = lo + (spectra[:, self._interp_hi] - lo) * self._interp_frac
+        return np.ascontiguousarray(frames, dtype=np.float32), hop, len(audio)
+    
+    def _analysis_cache_path(self, file_path: str, sample_rate: int) -> Optional[Path]:
+        """Ruta en caché del audio de análisis (cambia si el archivo se modifica)"""
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except OSError:
+            return None
+        
+        key = f"{os.path.abspath(file_path)}|{mtime}|{sample_rate}"
+        return _ANALYSIS_CACHE_DIR / (hashlib.sha1(key.encode('utf-8')).hexdigest() + ".f32.npy")
+    
+    def _store_analysis_cache(self, cache_path: Path, audio: np.ndarray):
+        """Guarda el audio decodificado y recorta la caché al tamaño máximo (LRU)"""
+        try:
+            _ANALYSIS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            
+            # Escribir a un temporal y renombrar para no dejar archivos a medias
+            tmp_path = cache_path.with_name(cache_path.name.replace(".f32.npy", ".tmp.npy"))
+            np.save(tmp_path, np.asarray(audio, dtype=np.float32))
+            os.replace(tmp_path, cache_path)
+            
+            # Expulsar los menos usados recientemente hasta quedar bajo el límite
+            entries = []
+            total = 0
+            for entry in _ANALYSIS_CACHE_DIR.glob("*.f32.npy"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry))
+                total += stat.st_size
+            
+            if total > _ANALYSIS_CACHE_MAX_BYTES:
+                entries.sort()
+                for _, size, entry in entries:
+                    if total <= _ANALYSIS_CACHE_MAX_BYTES:
+                        break
+                    if entry == cache_path:
+                        continue
+                    try:
+                        entry.unlink()
+                        total -= size
+                    except OSError:
+                        pass
+                        
+        except Exception as e:
+            logger.debug(f"No se pudo guardar la caché de análisis: {e}")
+    
     def _on_end_reached(self, event):
         """Callback cuando termina la reproducción"""
         self.is_playing = False
@@ -796,6 +1021,24 @@ class VLCAudioEngine:
         if current_time > 0:
             self.current_position = current_time
     
+    def _on_length_changed(self, event):
+        """Callback cuando VLC conoce la duración de la media (hilo de VLC)"""
+        length = event.u.new_length
+        if length > 0:
+            self.duration = length / 1000.0
+            self._metadata_ready.set()
+    
+    async def wait_for_metadata(self, timeout: float = 1.0):
+        """Espera a que se conozca la duración de la pista cargada
+        
+        Lanza asyncio.TimeoutError si no llega antes de ``timeout`` segundos.
+        Se puede llamar desde cualquier event loop.
+        """
+        if self._metadata_ready.is_set():
+            return
+        if not await asyncio.to_thread(self._metadata_ready.wait, timeout):
+            raise asyncio.TimeoutError
+    
     # Getters para información de estado
     def get_position(self) -> float:
         """Obtiene la posición actual (0.0 - 1.0)"""
@@ -804,20 +1047,37 @@ class VLCAudioEngine:
     def get_time(self) -> float:
         """Obtiene el tiempo actual en segundos"""
         time = self.current_position
-        if time > 0:
+        if time > 0 and logger.isEnabledFor(logging.DEBUG):
             logger.debug(f"🕒 Tiempo actual: {time:.1f}s")
         return time
     
-    def get_duration(self) -> float:
-        """Obtiene la duración total en segundos"""
+    @property
+    def duration_cached(self) -> float:
+        """Duración total en segundos ya conocida (sin consultar a VLC)"""
         return self.duration
     
     def get_volume(self) -> int:
         """Obtiene el volumen actual"""
         return self.volume
     
+    def register_spectrum_callback(self, callback: Callable):
+        """Registra el consumidor de frames de espectro
+        
+        El callback recibe una vista de solo lectura que el motor reescribe
+        unos frames después: debe copiarla si necesita conservarla.
+        """
+        self.spectrum_callback = callback
+    
+    def unregister_spectrum_callback(self):
+        """Quita el consumidor de espectro (el análisis queda en reposo)"""
+        self.spectrum_callback = None
+    
     def get_spectrum_data(self) -> np.ndarray:
-        """Obtiene datos del espectro actual"""
+        """Obtiene una copia independiente del espectro actual
+        
+        Para leer sin copiar el último frame está la propiedad ``spectrum_data``,
+        que apunta a una ranura del anillo que se reescribe.
+        """
         return self.spectrum_data.copy()
     
     def is_media_loaded(self) -> bool:
@@ -827,6 +1087,11 @@ class VLCAudioEngine:
     def cleanup(self):
         """Limpieza ROBUSTA de recursos"""
         try:
+            # Descartar un cambio de volumen pendiente
+            if self._volume_timer is not None:
+                self._volume_timer.cancel()
+                self._volume_timer = None
+            
             # Cancelar TODAS las tareas de background de forma segura
             self._cancel_background_tasks_sync()
             
@@ -848,6 +1113,12 @@ class VLCAudioEngine:
                 except Exception as e:
                     logger.warning(f"Error liberando instancia: {e}")
             
+            # Terminar el hilo de análisis (después de stop, que vacía la cola)
+            self._enqueue_analysis(None)
+            
+            # Liberar el executor sin esperar a llamadas pendientes
+            self._exec.shutdown(wait=False, cancel_futures=True)
+            
             # Limpiar variables de estado
             self.audio_loaded = False
             self.current_audio_path = None
@@ -862,17 +1133,17 @@ class VLCAudioEngine:
     async def play_async(self):
         """Versión async de play"""
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.play)
+        return await loop.run_in_executor(self._exec, self.play)
     
     async def pause_async(self):
         """Versión async de pause"""
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.pause)
+        return await loop.run_in_executor(self._exec, self.pause)
     
     async def resume_async(self):
         """Versión async de resume"""
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.resume)
+        return await loop.run_in_executor(self._exec, self.resume)
         return True
     
     async def stop_async(self):
@@ -888,23 +1159,27 @@ class VLCAudioEngine:
     async def seek_async(self, position: float):
         """Versión async de seek"""
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.seek, position)
+        return await loop.run_in_executor(self._exec, self.seek, position)
     
     async def set_volume_async(self, volume: int):
         """Versión async de set_volume"""
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.set_volume, volume)
+        return await loop.run_in_executor(self._exec, self.set_volume, volume)
     
-    async def get_duration(self):
-        """Versión async de get_duration"""
-        try:
-            if self.media:
-                duration = self.media.get_duration()
-                if duration > 0:
-                    return duration / 1000.0
+    async def get_duration(self) -> float:
+        """Obtiene la duración total en segundos consultando a VLC fuera del loop"""
+        media = self.media
+        if media is None:
             return 0.0
-        except:
+        try:
+            loop = asyncio.get_event_loop()
+            duration = await loop.run_in_executor(self._exec, media.get_duration)
+        except Exception:
             return 0.0
+        if duration > 0:
+            self.duration = duration / 1000.0  # Queda disponible en duration_cached
+            return self.duration
+        return 0.0
 
 # Singleton para acceso global
 _vlc_engine_instance = None
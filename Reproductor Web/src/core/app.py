@@ -10,8 +10,14 @@ Núcleo principal del reproductor musical que coordina todos los componentes:
 """
 
 import asyncio
-import threading
+import bisect
+import contextlib
+import contextvars
 import os
+import random
+import time
+import traceback
+from collections import defaultdict, deque
 from typing import Optional, Dict, List, Any, Callable
 from pathlib import Path
 import logging
@@ -21,6 +27,9 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Siguiente modo de repetición en el ciclo none -> one -> all
+_NEXT_REPEAT = {"none": "one", "one": "all", "all": "none"}
+
 @dataclass
 class Track:
     """Información de una pista musical"""
@@ -33,6 +42,8 @@ class Track:
     genre: str = ""
     year: int = 0
     track_number: int = 0
+    valid: bool = True  # El archivo existía en la última verificación
+    last_checked: float = 0.0  # time.monotonic() de esa verificación
     
 class PlaybackState:
     """Estado de reproducción"""
@@ -59,15 +70,42 @@ class MusicPlayerProApp:
         self.playback_state = PlaybackState.STOPPED
         self.current_track: Optional[Track] = None
         self.current_playlist: List[Track] = []
+        self._index_map: Dict[str, int] = {}  # Ruta -> índice en current_playlist
+        self._playlist_is_library_view = False  # current_playlist ES music_library (sin copiar)
         self.current_index = 0
         self.shuffle_enabled = False
         self.repeat_mode = "none"  # none, one, all
         
+        # Modo aleatorio: permutación pendiente de la playlist (sin repetir hasta
+        # agotarla) e historial de índices ya reproducidos para volver atrás
+        self._shuffle_order: deque = deque()
+        self._shuffle_len = 0
+        self._shuffle_history: deque = deque(maxlen=500)
+        
+        # Biblioteca musical e índices de búsqueda (se reconstruyen al cargarla)
+        self.music_library: List[Track] = []
+        self._search_index: List[str] = []  # "titulo\nartista\nalbum" en minúsculas
+        # Todo el índice en un solo texto separado por \0 y el inicio de cada pista
+        self._search_corpus = ""
+        self._search_offsets: List[int] = []
+        # Columnas en minúsculas paralelas a music_library (mismo índice i)
+        self._lib_title_lc: List[str] = []
+        self._lib_artist_lc: List[str] = []
+        self._lib_album_lc: List[str] = []
+        self._lib_genre_lc: List[str] = []
+        self._by_artist: Dict[str, List[Track]] = {}
+        self._by_album: Dict[str, List[Track]] = {}
+        self._by_genre: Dict[str, List[Track]] = {}
+        
         # Información de reproducción
         self.position = 0.0
         self.duration = 0.0
         self.volume = 70
         
+        # Emisión de posición limitada a ~30 por segundo con un payload reutilizado
+        self._pos_last_emit = 0.0
+        self._pos_payload = {'position': 0.0, 'duration': 0.0}
+        
         # Callbacks para la UI
         self.ui_callbacks = {
             'track_changed': [],
@@ -77,8 +115,16 @@ class MusicPlayerProApp:
             'playlist_changed': []
         }
         
+        # Eventos acumulados mientras hay un lote abierto (ver _batch_events).
+        # Es una variable de contexto: cada tarea (y cada hilo) ve solo su
+        # propio lote, así que los eventos de otras fuentes no se retienen
+        self._event_batch: contextvars.ContextVar = contextvars.ContextVar(
+            f"event_batch_{id(self)}", default=None
+        )
+        
         # Control de bucle principal
         self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # Loop donde corre run()
         self._update_task = None
         
         logger.info("Aplicación MusicPlayerPro inicializada")
@@ -88,11 +134,48 @@ class MusicPlayerProApp:
         if event in self.ui_callbacks:
             self.ui_callbacks[event].append(callback)
     
+    # Eventos de estado: dentro de un lote solo importa el último valor
+    _COALESCED_EVENTS = frozenset({'playback_state_changed', 'position_changed', 'volume_changed'})
+    
     def _emit_event(self, event: str, data: Any = None):
         """Emite evento a todos los callbacks registrados"""
         if self._is_shutting_down:  # No emitir eventos durante el cierre
             return
-            
+        
+        batch = self._event_batch.get()
+        if batch is not None:
+            batch.append((event, data))
+            return
+        
+        self._dispatch_event(event, data)
+    
+    @contextlib.asynccontextmanager
+    async def _batch_events(self):
+        """Acumula los eventos emitidos dentro del bloque y los despacha al salir
+        
+        De los eventos de estado se conserva solo la última emisión; el resto
+        se despacha en orden. Solo se acumulan los eventos emitidos desde la
+        tarea que abrió el bloque; un bloque anidado se une al exterior.
+        """
+        if self._event_batch.get() is not None:
+            yield
+            return
+        
+        batch = []
+        token = self._event_batch.set(batch)
+        try:
+            yield
+        finally:
+            self._event_batch.reset(token)
+            last = {event: i for i, (event, _) in enumerate(batch)
+                    if event in self._COALESCED_EVENTS}
+            for i, (event, data) in enumerate(batch):
+                if event in last and last[event] != i:
+                    continue
+                self._emit_event(event, data)
+    
+    def _dispatch_event(self, event: str, data: Any = None):
+        """Llama a los callbacks registrados para un evento"""
         if event in self.ui_callbacks:
             for callback in self.ui_callbacks[event]:
                 try:
@@ -108,6 +191,7 @@ class MusicPlayerProApp:
         try:
             logger.info("Iniciando aplicación MusicPlayerPro...")
             self._running = True
+            self._loop = asyncio.get_running_loop()
             
             # Configurar callbacks del motor de audio
             self.audio_engine.position_callback = self._on_position_update
@@ -152,7 +236,7 @@ class MusicPlayerProApp:
                 if self.playback_state == PlaybackState.PLAYING:
                     position = await self._get_playback_position()
                     if position != self.position:
-                        logger.info(f"📊 Actualizando posición: {position:.1f}s / {self.duration:.1f}s")
+                        logger.debug("📊 Actualizando posición: %.1fs / %.1fs", position, self.duration)
                         self.position = position
                         self._emit_event('position_changed', {
                             'position': self.position,
@@ -162,7 +246,7 @@ class MusicPlayerProApp:
                 await asyncio.sleep(0.1)  # 10 FPS de actualización
                 
             except Exception as e:
-                logger.error(f"Error en bucle de actualización: {e}")
+                logger.error("Error en bucle de actualización: %s", e)
                 await asyncio.sleep(1)
     
     async def _get_playback_position(self):
@@ -183,6 +267,7 @@ class MusicPlayerProApp:
             # Verificar archivos existentes y limpiar rutas inválidas
             valid_tracks = []
             invalid_track_ids = []
+            checked_at = time.monotonic()
             
             for track_data in tracks_data:
                 file_path = track_data.get('path', '')
@@ -200,7 +285,9 @@ class MusicPlayerProApp:
                         duration=track_data.get('duration', 0.0),
                         genre=track_data.get('genre', ''),
                         year=track_data.get('year', 0),
-                        track_number=track_data.get('track_number', 0)
+                        track_number=track_data.get('track_number', 0),
+                        valid=True,
+                        last_checked=checked_at
                     )
                     valid_tracks.append(track)
                 else:
@@ -215,6 +302,7 @@ class MusicPlayerProApp:
                 await self._remove_invalid_tracks(invalid_track_ids)
             
             self.music_library = valid_tracks
+            self._build_library_index()
             
             if len(valid_tracks) == 0 and len(tracks_data) > 0:
                 logger.warning("⚠️ Biblioteca vacía: todos los archivos fueron inválidos")
@@ -225,6 +313,41 @@ class MusicPlayerProApp:
         except Exception as e:
             logger.error(f"Error cargando biblioteca musical: {e}")
             self.music_library = []
+            self._build_library_index()
+    
+    def _build_library_index(self):
+        """Precalcula los campos en minúsculas de la biblioteca para búsquedas y filtros"""
+        library = self.music_library
+        
+        # Una columna por campo: cada texto se pasa a minúsculas una sola vez
+        self._lib_title_lc = [track.title.lower() for track in library]
+        self._lib_artist_lc = [track.artist.lower() for track in library]
+        self._lib_album_lc = [track.album.lower() for track in library]
+        self._lib_genre_lc = [track.genre.lower() for track in library]
+        
+        self._search_index = [
+            f"{title}\n{artist}\n{album}"
+            for title, artist, album in zip(self._lib_title_lc, self._lib_artist_lc, self._lib_album_lc)
+        ]
+        
+        offsets = []
+        pos = 0
+        for blob in self._search_index:
+            offsets.append(pos)
+            pos += len(blob) + 1
+        self._search_offsets = offsets
+        self._search_corpus = "\0".join(self._search_index)
+        
+        self._by_artist = self._group_by_column(self._lib_artist_lc)
+        self._by_album = self._group_by_column(self._lib_album_lc)
+        self._by_genre = self._group_by_column(self._lib_genre_lc)
+    
+    def _group_by_column(self, column: List[str]) -> Dict[str, List[Track]]:
+        """Agrupa las pistas de la biblioteca por el valor de una columna"""
+        groups = defaultdict(list)
+        for track, key in zip(self.music_library, column):
+            groups[key].append(track)
+        return dict(groups)
     
     async def reload_library(self):
         """Método público para recargar la biblioteca musical"""
@@ -262,75 +385,85 @@ class MusicPlayerProApp:
     async def play_track(self, track: Track):
         """Reproduce una pista específica"""
         try:
-            logger.info(f"Reproduciendo: {track.artist} - {track.title}")
-            logger.info(f"🔧 Estado actual: {self.playback_state}")
+            logger.info("Reproduciendo: %s - %s", track.artist, track.title)
+            logger.info("🔧 Estado actual: %s", self.playback_state)
             
             # Detener pista anterior si hay una reproduciéndose
             if self.playback_state == PlaybackState.PLAYING:
-                logger.info(f"⏹️ Deteniendo pista anterior...")
+                logger.info("⏹️ Deteniendo pista anterior...")
                 try:
                     # Stop con timeout para evitar bloqueos
                     await asyncio.wait_for(self.audio_engine.stop_async(), timeout=0.5)
                 except asyncio.TimeoutError:
                     logger.warning("⚠️ Timeout deteniendo pista - continuando...")
                 except Exception as e:
-                    logger.warning(f"⚠️ Error deteniendo pista: {e} - continuando...")
+                    logger.warning("⚠️ Error deteniendo pista: %s - continuando...", e)
                 
                 await asyncio.sleep(0.05)  # Pausa mínima
-                logger.info(f"✅ Pista anterior detenida")
+                logger.info("✅ Pista anterior detenida")
             
-            logger.info(f"🎯 Estableciendo nueva pista como actual...")
+            logger.info("🎯 Estableciendo nueva pista como actual...")
             self.current_track = track
             
             # Sincronizar playlist actual y encontrar índice de la pista
             if not self.current_playlist:
-                self.current_playlist = self.music_library.copy()
-                logger.info(f"📋 Playlist inicializada con {len(self.current_playlist)} pistas")
+                self._set_current_playlist(self.music_library, library_view=True)
+                logger.info("📋 Playlist inicializada con %s pistas", len(self.current_playlist))
             
             # Encontrar el índice de la pista actual en la playlist
             try:
-                for i, playlist_track in enumerate(self.current_playlist):
-                    if (hasattr(playlist_track, 'path') and hasattr(track, 'path') and 
-                        playlist_track.path == track.path):
-                        self.current_index = i
-                        logger.info(f"📍 Índice de pista encontrado: {i}")
-                        break
+                playlist = self.current_playlist
+                index = self._index_map.get(track.path)
+                if index is not None and (index >= len(playlist) or playlist[index].path != track.path):
+                    # La lista se modificó por fuera del índice: reconstruirlo
+                    self._set_current_playlist(playlist, self._playlist_is_library_view)
+                    index = self._index_map.get(track.path)
+                
+                if index is not None:
+                    self.current_index = index
+                    logger.info("📍 Índice de pista encontrado: %s", index)
                 else:
                     # Si no se encuentra, agregar al final y usar ese índice
-                    self.current_playlist.append(track)
+                    self._append_to_playlist(track)
                     self.current_index = len(self.current_playlist) - 1
-                    logger.info(f"📍 Pista agregada al final, índice: {self.current_index}")
+                    logger.info("📍 Pista agregada al final, índice: %s", self.current_index)
             except Exception as e:
-                logger.warning(f"Error encontrando índice de pista: {e}")
+                logger.warning("Error encontrando índice de pista: %s", e)
                 self.current_index = 0
             
-            logger.info(f"🔄 Cambiando estado a LOADING...")
-            self.playback_state = PlaybackState.LOADING
-            logger.info(f"📡 Emitiendo evento de cambio de estado...")
-            self._emit_event('playback_state_changed', self.playback_state)
-            logger.info(f"✅ Estado establecido correctamente")
-            
-            # Debug: verificar path de la pista
-            logger.info(f"🔍 Verificando path: '{track.path}'")
-            if not track.path or not os.path.exists(track.path):
-                logger.error(f"❌ Path inválido o archivo no existe: '{track.path}'")
-                return
-            
-            # Cargar y reproducir en el motor de audio
-            logger.info(f"📂 Cargando pista desde: {track.path}")
-            success = await self.audio_engine.load_track(track.path)
-            if success:
+            # Los eventos de la carga se despachan juntos al notificar la pista
+            async with self._batch_events():
+                logger.info("🔄 Cambiando estado a LOADING...")
+                self._set_state(PlaybackState.LOADING)
+                
+                # Debug: verificar path de la pista
+                logger.info("🔍 Verificando path: '%s'", track.path)
+                if not track.path or not self._is_track_file_valid(track):
+                    logger.error("❌ Path inválido o archivo no existe: '%s'", track.path)
+                    return
+                
+                # Cargar y reproducir en el motor de audio
+                logger.info("📂 Cargando pista desde: %s", track.path)
+                success = await self.audio_engine.load_track(track.path)
+                if not success:
+                    logger.error("Error cargando pista: %s", track.path)
+                    self._set_state(PlaybackState.STOPPED)
+                    return
+                
                 await self.audio_engine.play_async()
-                self.playback_state = PlaybackState.PLAYING
+                self._set_state(PlaybackState.PLAYING)
                 
-                # Obtener duración después de un pequeño retraso
-                await asyncio.sleep(0.2)
+                # Obtener duración en cuanto el motor la conozca
+                try:
+                    await self.audio_engine.wait_for_metadata(timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
                 try:
                     duration = await self.audio_engine.get_duration()
                     self.duration = duration if duration > 0 else 0.0
-                    logger.info(f"🕒 Duración obtenida: {self.duration:.1f}s")
+                    logger.info("🕒 Duración obtenida: %.1fs", self.duration)
                 except Exception as e:
-                    logger.warning(f"No se pudo obtener duración: {e}")
+                    logger.warning("No se pudo obtener duración: %s", e)
                     self.duration = 0.0
                 
                 # Actualizar visualizador
@@ -338,21 +471,39 @@ class MusicPlayerProApp:
                 
                 # Notificar cambio de pista
                 self._emit_event('track_changed', track)
-                self._emit_event('playback_state_changed', self.playback_state)
-                
-                # Actualizar estadísticas en la base de datos
-                await self.db_manager.add_play_history(track.id)
-                
-            else:
-                logger.error(f"Error cargando pista: {track.path}")
-                self.playback_state = PlaybackState.STOPPED
-                self._emit_event('playback_state_changed', self.playback_state)
-                
+            
+            # Actualizar estadísticas en la base de datos, ya con la UI notificada
+            # (el INSERT corre en un hilo; se espera aquí porque el loop de una
+            # petición de Flask se cierra al volver y una tarea suelta se perdería)
+            await self.db_manager.add_play_history(track.id)
+            
         except Exception as e:
-            logger.error(f"Error reproduciendo pista: {e}")
-            self.playback_state = PlaybackState.STOPPED
-            self._emit_event('playback_state_changed', self.playback_state)
-            self._emit_event('playback_state_changed', self.playback_state)
+            logger.error("Error reproduciendo pista: %s", e)
+            self._set_state(PlaybackState.STOPPED)
+    
+    # Segundos antes de volver a comprobar en disco una pista marcada inválida
+    TRACK_RECHECK_INTERVAL = 60.0
+    
+    def _is_track_file_valid(self, track: Track) -> bool:
+        """Indica si el archivo de la pista existe, usando la verificación del escaneo
+        
+        Solo se vuelve a consultar el disco para pistas marcadas como inválidas
+        y no más de una vez por TRACK_RECHECK_INTERVAL.
+        """
+        if track.valid:
+            return True
+        
+        now = time.monotonic()
+        if now - track.last_checked > self.TRACK_RECHECK_INTERVAL:
+            track.valid = os.path.isfile(track.path)
+            track.last_checked = now
+        return track.valid
+    
+    def _set_state(self, new_state: str):
+        """Cambia el estado de reproducción y lo notifica solo si cambió"""
+        if self.playback_state != new_state:
+            self.playback_state = new_state
+            self._emit_event('playback_state_changed', new_state)
     
     async def play_pause(self):
         """Alterna entre reproducir y pausar"""
@@ -367,25 +518,22 @@ class MusicPlayerProApp:
         """Pausa la reproducción"""
         if self.playback_state == PlaybackState.PLAYING:
             await self.audio_engine.pause_async()
-            self.playback_state = PlaybackState.PAUSED
+            self._set_state(PlaybackState.PAUSED)
             await self.visual_manager.pause_visualization()
-            self._emit_event('playback_state_changed', self.playback_state)
     
     async def resume(self):
         """Reanuda la reproducción"""
         if self.playback_state == PlaybackState.PAUSED:
             await self.audio_engine.resume_async()
-            self.playback_state = PlaybackState.PLAYING
+            self._set_state(PlaybackState.PLAYING)
             await self.visual_manager.resume_visualization()
-            self._emit_event('playback_state_changed', self.playback_state)
     
     async def stop(self):
         """Detiene la reproducción"""
         await self.audio_engine.stop_async()
-        self.playback_state = PlaybackState.STOPPED
+        self._set_state(PlaybackState.STOPPED)
         self.position = 0.0
         await self.visual_manager.stop_visualization()
-        self._emit_event('playback_state_changed', self.playback_state)
     
     async def next_track(self):
         """Reproduce la siguiente pista"""
@@ -400,17 +548,11 @@ class MusicPlayerProApp:
                 return
                 
             if self.shuffle_enabled:
-                import random
-                # Generar índice aleatorio diferente al actual si es posible
-                if len(playlist) > 1:
-                    available_indices = [i for i in range(len(playlist)) if i != self.current_index]
-                    self.current_index = random.choice(available_indices)
-                else:
-                    self.current_index = 0
-                logger.info(f"🔀 Modo aleatorio: índice {self.current_index}")
+                self.current_index = self._next_shuffle_index(len(playlist))
+                logger.info("🔀 Modo aleatorio: índice %s", self.current_index)
             else:
                 self.current_index += 1
-                logger.info(f"➡️ Siguiente pista: índice {self.current_index}")
+                logger.info("➡️ Siguiente pista: índice %s", self.current_index)
                 
                 if self.current_index >= len(playlist):
                     if self.repeat_mode == "all":
@@ -422,17 +564,16 @@ class MusicPlayerProApp:
                         return
             
             next_track = playlist[self.current_index]
-            logger.info(f"▶️ Cambiando a: {next_track.artist} - {next_track.title}")
+            logger.info("▶️ Cambiando a: %s - %s", next_track.artist, next_track.title)
             
             # Actualizar playlist actual si se está usando la biblioteca
             if not self.current_playlist:
-                self.current_playlist = self.music_library.copy()
+                self._set_current_playlist(self.music_library, library_view=True)
             
             await self.play_track(next_track)
             
         except Exception as e:
-            logger.error(f"❌ Error en next_track: {e}")
-            import traceback
+            logger.error("❌ Error en next_track: %s", e)
             traceback.print_exc()
     
     async def previous_track(self):
@@ -448,17 +589,11 @@ class MusicPlayerProApp:
                 return
                 
             if self.shuffle_enabled:
-                import random
-                # Generar índice aleatorio diferente al actual si es posible
-                if len(playlist) > 1:
-                    available_indices = [i for i in range(len(playlist)) if i != self.current_index]
-                    self.current_index = random.choice(available_indices)
-                else:
-                    self.current_index = 0
-                logger.info(f"🔀 Modo aleatorio: índice {self.current_index}")
+                self.current_index = self._previous_shuffle_index(len(playlist))
+                logger.info("🔀 Modo aleatorio: índice %s", self.current_index)
             else:
                 self.current_index -= 1
-                logger.info(f"⬅️ Pista anterior: índice {self.current_index}")
+                logger.info("⬅️ Pista anterior: índice %s", self.current_index)
                 
                 if self.current_index < 0:
                     if self.repeat_mode == "all":
@@ -470,19 +605,69 @@ class MusicPlayerProApp:
                         return
             
             prev_track = playlist[self.current_index]
-            logger.info(f"▶️ Cambiando a: {prev_track.artist} - {prev_track.title}")
+            logger.info("▶️ Cambiando a: %s - %s", prev_track.artist, prev_track.title)
             
             # Actualizar playlist actual si se está usando la biblioteca
             if not self.current_playlist:
-                self.current_playlist = self.music_library.copy()
+                self._set_current_playlist(self.music_library, library_view=True)
             
             await self.play_track(prev_track)
             
         except Exception as e:
-            logger.error(f"❌ Error en previous_track: {e}")
-            import traceback
+            logger.error("❌ Error en previous_track: %s", e)
             traceback.print_exc()
     
+    def _next_shuffle_index(self, n: int) -> int:
+        """Siguiente índice aleatorio: recorre una permutación de la playlist
+        
+        Cada pista sale una vez por vuelta; al agotarse (o si cambia el tamaño
+        de la playlist) se genera una permutación nueva.
+        """
+        if n <= 1:
+            return 0
+        
+        order = self._shuffle_order
+        if not order or self._shuffle_len != n:
+            order = self._reset_shuffle(n)
+        
+        index = order.popleft()
+        if index == self.current_index:
+            # La pista actual ya suena: cuenta como reproducida en esta vuelta
+            if not order:
+                order = self._reset_shuffle(n)
+                index = order.popleft()
+                if index == self.current_index:
+                    order.append(index)
+                    index = order.popleft()
+            else:
+                index = order.popleft()
+        
+        self._shuffle_history.append(self.current_index)
+        return index
+    
+    def _previous_shuffle_index(self, n: int) -> int:
+        """Índice anterior en modo aleatorio: vuelve por el historial"""
+        if n <= 1:
+            return 0
+        
+        history = self._shuffle_history
+        while history:
+            index = history.pop()
+            if index < n:
+                # La pista actual vuelve a quedar como la siguiente
+                self._shuffle_order.appendleft(self.current_index)
+                return index
+        
+        # Sin historial: índice al azar distinto del actual (n-1 posiciones)
+        j = random.randrange(n - 1)
+        return j if j < self.current_index else j + 1
+    
+    def _reset_shuffle(self, n: int = 0) -> deque:
+        """Descarta el orden aleatorio pendiente y genera una permutación de n índices"""
+        self._shuffle_order = deque(random.sample(range(n), n))
+        self._shuffle_len = n
+        return self._shuffle_order
+    
     async def seek(self, position_percentage: float):
         """Busca una posición específica en la pista (0.0 - 1.0)"""
         await self.audio_engine.seek_async(position_percentage)
@@ -494,7 +679,12 @@ class MusicPlayerProApp:
         })
     
     async def set_volume(self, volume: int):
-        """Establece el volumen (0-100)"""
+        """Establece el volumen (0-100)
+        
+        Se aplica en línea: la UI ya agrupa los cambios del slider y el motor
+        tiene su propio debounce, y este método también se ejecuta en loops
+        temporales (Flask) donde una tarea diferida se destruiría pendiente.
+        """
         volume = max(0, min(100, volume))
         self.volume = volume
         await self.audio_engine.set_volume_async(volume)
@@ -504,7 +694,9 @@ class MusicPlayerProApp:
     
     async def set_playlist(self, tracks: List[Track], start_index: int = 0):
         """Establece una nueva playlist"""
-        self.current_playlist = tracks
+        self._set_current_playlist(tracks)
+        self._reset_shuffle()
+        self._shuffle_history.clear()
         self.current_index = start_index
         self._emit_event('playlist_changed', {
             'playlist': tracks,
@@ -513,29 +705,47 @@ class MusicPlayerProApp:
     
     async def add_to_queue(self, track: Track):
         """Añade una pista a la cola de reproducción"""
-        if not self.current_playlist:
-            self.current_playlist = []
-        
-        self.current_playlist.append(track)
+        self._append_to_playlist(track)
         self._emit_event('playlist_changed', {
             'playlist': self.current_playlist,
             'current_index': self.current_index
         })
     
+    def _set_current_playlist(self, tracks: List[Track], library_view: bool = False):
+        """Reemplaza la playlist actual y reconstruye el índice por ruta
+        
+        Con ``library_view`` la playlist comparte la lista de la biblioteca;
+        se copia recién cuando haya que modificarla.
+        """
+        self.current_playlist = tracks
+        self._playlist_is_library_view = library_view
+        index_map = {}
+        for i, track in enumerate(tracks):
+            index_map.setdefault(track.path, i)  # Primera aparición, como la búsqueda lineal
+        self._index_map = index_map
+    
+    def _append_to_playlist(self, track: Track):
+        """Agrega una pista al final de la playlist manteniendo el índice"""
+        if self._playlist_is_library_view:
+            # Copia al escribir: no modificar la biblioteca
+            self.current_playlist = list(self.current_playlist)
+            self._playlist_is_library_view = False
+        self._index_map.setdefault(track.path, len(self.current_playlist))
+        self.current_playlist.append(track)
+    
     def toggle_shuffle(self):
         """Alterna el modo aleatorio"""
-        print(f"🔀 CORE APP: toggle_shuffle llamado - shuffle anterior: {self.shuffle_enabled}")
         self.shuffle_enabled = not self.shuffle_enabled
-        print(f"🔀 CORE APP: shuffle nuevo: {self.shuffle_enabled}")
+        if self.shuffle_enabled:
+            self._reset_shuffle()
+            self._shuffle_history.clear()
+        logger.debug("🔀 Modo aleatorio: %s", self.shuffle_enabled)
         return self.shuffle_enabled
     
     def cycle_repeat_mode(self):
         """Cambia entre modos de repetición"""
-        print(f"🔁 CORE APP: cycle_repeat_mode llamado - repeat anterior: {self.repeat_mode}")
-        modes = ["none", "one", "all"]
-        current_idx = modes.index(self.repeat_mode)
-        self.repeat_mode = modes[(current_idx + 1) % len(modes)]
-        print(f"🔁 CORE APP: repeat nuevo: {self.repeat_mode}")
+        self.repeat_mode = _NEXT_REPEAT[self.repeat_mode]
+        logger.debug("🔁 Modo repetición: %s", self.repeat_mode)
         return self.repeat_mode
     
     # EVENTOS DE AUDIO
@@ -545,52 +755,42 @@ class MusicPlayerProApp:
         self.position = current_time
         if duration:
             self.duration = duration
-            
+        
+        # VLC notifica la posición muy seguido: no emitir más de ~30 veces/s
+        now = time.monotonic()
+        if now - self._pos_last_emit < 0.033:
+            return
+        self._pos_last_emit = now
+        
         # Emitir evento para actualizar UI
-        self._emit_event('position_changed', {
-            'position': current_time,
-            'duration': self.duration or 0
-        })
+        payload = self._pos_payload
+        payload['position'] = current_time
+        payload['duration'] = self.duration or 0
+        self._emit_event('position_changed', payload)
     
     def _on_track_ended(self):
-        """Callback cuando termina una pista"""
-        try:
-            logger.info(f"🔚 Pista terminada. Modo repeat: {self.repeat_mode}")
-            
-            loop = asyncio.get_event_loop()
-            if self.repeat_mode == "one":
-                # Repetir la misma pista
-                if self.current_track:
-                    logger.info("🔁 Repitiendo la misma pista (repeat one)")
-                    loop.call_soon_threadsafe(
-                        lambda: asyncio.create_task(self.play_track(self.current_track))
-                    )
-                else:
-                    logger.warning("⚠️ No hay pista actual para repetir")
-            else:
-                # Ir a la siguiente pista (maneja repeat all internamente)
-                logger.info("➡️ Cambiando a siguiente pista")
+        """Callback cuando termina una pista (llamado desde el hilo de VLC)"""
+        loop = self._loop
+        if self._is_shutting_down or loop is None or loop.is_closed():
+            return
+        
+        logger.info("🔚 Pista terminada. Modo repeat: %s", self.repeat_mode)
+        
+        if self.repeat_mode == "one":
+            # Repetir la misma pista
+            if self.current_track:
+                logger.info("🔁 Repitiendo la misma pista (repeat one)")
                 loop.call_soon_threadsafe(
-                    lambda: asyncio.create_task(self.next_track())
+                    lambda: asyncio.create_task(self.play_track(self.current_track))
                 )
-        except RuntimeError:
-            # No hay loop activo, intentar crear la tarea de forma segura
-            logger.warning("⚠️ No hay loop activo, usando thread alternativo")
-            import threading
-            def run_next():
-                try:
-                    if self.repeat_mode == "one" and self.current_track:
-                        # Para repetir, reproducir la misma pista
-                        logger.info("🔁 Repitiendo la misma pista (thread)")
-                        asyncio.run(self.play_track(self.current_track))
-                    else:
-                        # Para siguiente pista
-                        logger.info("➡️ Siguiente pista (thread)")
-                        asyncio.run(self.next_track())
-                except Exception as e:
-                    logger.error(f"Error en thread de reproducción: {e}")
-            
-            threading.Thread(target=run_next, daemon=True).start()
+            else:
+                logger.warning("⚠️ No hay pista actual para repetir")
+        else:
+            # Ir a la siguiente pista (maneja repeat all internamente)
+            logger.info("➡️ Cambiando a siguiente pista")
+            loop.call_soon_threadsafe(
+                lambda: asyncio.create_task(self.next_track())
+            )
     
     def _on_spectrum_update(self, spectrum_data):
         """Callback para datos de espectro"""
@@ -612,13 +812,22 @@ class MusicPlayerProApp:
         """Busca pistas por título, artista o álbum"""
         try:
             query = query.lower()
+            library = self.music_library
+            if not query or "\0" in query:
+                return list(library) if not query else []
+            
+            # Búsqueda en C sobre el corpus completo: solo se itera en Python
+            # por cada coincidencia, saltando al inicio de la pista siguiente
+            corpus = self._search_corpus
+            offsets = self._search_offsets
             results = []
-            
-            for track in self.music_library:
-                if (query in track.title.lower() or 
-                    query in track.artist.lower() or 
-                    query in track.album.lower()):
-                    results.append(track)
+            pos = corpus.find(query)
+            while pos != -1:
+                i = bisect.bisect_right(offsets, pos) - 1
+                results.append(library[i])
+                if i + 1 >= len(offsets):
+                    break
+                pos = corpus.find(query, offsets[i + 1])
             
             return results
             
@@ -628,15 +837,15 @@ class MusicPlayerProApp:
     
     async def get_tracks_by_artist(self, artist: str) -> List[Track]:
         """Obtiene todas las pistas de un artista"""
-        return [track for track in self.music_library if track.artist.lower() == artist.lower()]
+        return list(self._by_artist.get(artist.lower(), ()))
     
     async def get_tracks_by_album(self, album: str) -> List[Track]:
         """Obtiene todas las pistas de un álbum"""
-        return [track for track in self.music_library if track.album.lower() == album.lower()]
+        return list(self._by_album.get(album.lower(), ()))
     
     async def get_tracks_by_genre(self, genre: str) -> List[Track]:
         """Obtiene todas las pistas de un género"""
-        return [track for track in self.music_library if track.genre.lower() == genre.lower()]
+        return list(self._by_genre.get(genre.lower(), ()))
     
     # RECOMENDACIONES IA
     
@@ -12,16 +12,92 @@ Sistema de configuración completo con:
 
 import json
 import asyncio
+import os
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional, Union, List
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import logging
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Secciones de la configuración respaldadas por un dataclass
+_SECTIONS = ('audio', 'ui', 'visualization', 'ai', 'library', 'network')
+
+def _dump_json(data: Any) -> bytes:
+    """Serializa a JSON indentado (orjson si está disponible)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+# Helpers bloqueantes de E/S: se ejecutan con asyncio.to_thread para no
+# detener el loop mientras se lee o escribe en disco
+
+def _flatten_into(flat: Dict[str, Any], node: Any, path: str):
+    """Registra ``node`` y todos sus descendientes bajo su ruta con puntos"""
+    flat[path] = node
+    if isinstance(node, dict):
+        for k, v in node.items():
+            _flatten_into(flat, v, f"{path}.{k}")
+
+def _load_json_bytes(raw: bytes) -> Any:
+    """Parsea JSON desde bytes (orjson si está disponible)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+def _read_json(path: Path) -> Optional[Any]:
+    """Lee un archivo JSON; None si no existe"""
+    if not path.exists():
+        return None
+    return _load_json_bytes(path.read_bytes())
+
+def _write_atomic(path: Path, payload: bytes):
+    """Escribe a un temporal y lo renombra: el archivo nunca queda a medias"""
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+
+def _read_theme(theme_file: Path) -> tuple:
+    """Lee un tema JSON y devuelve (nombre, datos)"""
+    return theme_file.stem, _load_json_bytes(theme_file.read_bytes())
+
+def _write_missing_themes(themes_dir: Path, themes: Dict[str, Any]) -> List[str]:
+    """Escribe los temas que aún no existen en disco y devuelve sus nombres"""
+    created = []
+    for theme_name, theme_data in themes.items():
+        theme_file = themes_dir / f"{theme_name}.json"
+        if theme_file.exists():
+            continue
+        try:
+            with open(theme_file, 'w', encoding='utf-8') as f:
+                json.dump(theme_data, f, indent=2, ensure_ascii=False)
+            created.append(theme_name)
+            logger.info(f"Tema por defecto creado: {theme_name}")
+        except Exception as e:
+            logger.error(f"Error creando tema {theme_name}: {e}")
+    return created
+
+class _ConfigSection:
+    """Base de las secciones: avisa al gestor cuando se asigna un campo"""
+    
+    # Lo asigna ConfigManager._bind_section; None mientras no tenga gestor
+    _on_change = None
+    
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if self._on_change is not None:
+            self._on_change()
+
 @dataclass
-class AudioConfig:
+class AudioConfig(_ConfigSection):
     """Configuración de audio"""
     volume: int = 70
     crossfade_duration: float = 3.0
@@ -38,7 +114,7 @@ class AudioConfig:
             self.equalizer_bands = [0.0] * 10  # 10 bandas planas
 
 @dataclass
-class UIConfig:
+class UIConfig(_ConfigSection):
     """Configuración de interfaz"""
     theme: str = "cyberpunk"
     window_width: int = 1280
@@ -55,7 +131,7 @@ class UIConfig:
     font_size: int = 12
 
 @dataclass
-class VisualizationConfig:
+class VisualizationConfig(_ConfigSection):
     """Configuración de visualización"""
     enabled: bool = True
     type: str = "spectrum_3d"  # spectrum_3d, waveform, particles, etc.
@@ -68,7 +144,7 @@ class VisualizationConfig:
     glow_effect: bool = True
 
 @dataclass
-class AIConfig:
+class AIConfig(_ConfigSection):
     """Configuración de IA"""
     recommendations_enabled: bool = True
     auto_genre_detection: bool = True
@@ -86,7 +162,7 @@ class AIConfig:
             }
 
 @dataclass
-class LibraryConfig:
+class LibraryConfig(_ConfigSection):
     """Configuración de biblioteca"""
     auto_scan_folders: List[str] = None
     watch_folders: bool = True
@@ -106,7 +182,7 @@ class LibraryConfig:
             ]
 
 @dataclass
-class NetworkConfig:
+class NetworkConfig(_ConfigSection):
     """Configuración de red"""
     enable_remote_control: bool = False
     remote_port: int = 8080
@@ -137,11 +213,26 @@ class ConfigManager:
         # Configuración general
         self._config_data = {}
         
+        # Vista plana de _config_data por ruta con puntos ("ui.theme"), incluidos
+        # los nodos intermedios; None = reconstruir en el próximo get()
+        self._flat_config: Optional[Dict[str, Any]] = None
+        
+        # Claves de primer nivel modificadas desde el último guardado, con
+        # set() o asignando un campo de un dataclass (ver _bind_section)
+        self._dirty_sections = set(_SECTIONS)
+        for name in _SECTIONS:
+            self._bind_section(name)
+        
         # Callbacks para cambios
         self._change_callbacks = {}
         
         # Temas disponibles
         self._themes = {}
+        
+        # Serializa las lecturas/escrituras del archivo de configuración. Es un
+        # lock de hilos: el gestor es un singleton que también usan los hilos
+        # de Flask, cada uno con su propio event loop
+        self._io_lock = threading.Lock()
     
     async def initialize(self):
         """Inicializa el gestor de configuración"""
@@ -170,10 +261,9 @@ class ConfigManager:
     async def load_config(self):
         """Carga configuración desde archivo"""
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
+            data = await asyncio.to_thread(self._locked_io, _read_json, self.config_file)
+            
+            if data is not None:
                 # Cargar configuraciones específicas
                 if 'audio' in data:
                     self.audio = AudioConfig(**data['audio'])
@@ -195,6 +285,11 @@ class ConfigManager:
                 
                 # Guardar datos completos
                 self._config_data = data
+                self._flat_config = None
+                for name in _SECTIONS:
+                    self._bind_section(name)
+                # Las secciones que faltan en el archivo se escriben en el próximo guardado
+                self._dirty_sections = {name for name in _SECTIONS if name not in data}
                 
                 logger.info("✅ Configuración cargada desde archivo")
             else:
@@ -206,24 +301,46 @@ class ConfigManager:
             logger.error(f"Error cargando configuración: {e}")
             # Usar configuración por defecto en caso de error
     
-    async def save_config(self):
-        """Guarda configuración a archivo"""
+    def _locked_io(self, func, *args):
+        """Ejecuta una operación de E/S del archivo bajo ``_io_lock`` (en el hilo)"""
+        with self._io_lock:
+            return func(*args)
+    
+    def _bind_section(self, name: str):
+        """Marca la sección ``name`` como modificada al asignar uno de sus campos
+        
+        Las mutaciones en el sitio (``equalizer_bands[0] = 1.0``) no se ven:
+        hay que reasignar el campo o usar set().
+        """
+        object.__setattr__(getattr(self, name), '_on_change',
+                           lambda: self._dirty_sections.add(name))
+    
+    async def save_config(self, force: bool = False):
+        """Guarda configuración a archivo
+        
+        Sin cambios desde el último guardado (ni con set() ni en los
+        dataclasses) no se escribe nada; ``force`` obliga a reescribir.
+        Solo se convierten con asdict las secciones modificadas.
+        """
         try:
-            config_data = {
-                'audio': asdict(self.audio),
-                'ui': asdict(self.ui),
-                'visualization': asdict(self.visualization),
-                'ai': asdict(self.ai),
-                'library': asdict(self.library),
-                'network': asdict(self.network),
-                'last_updated': datetime.now().isoformat()
-            }
+            dirty = set(self._dirty_sections)
+            if not force and not dirty and self.config_file.exists():
+                return
             
             # Combinar con datos existentes
-            self._config_data.update(config_data)
+            for name in _SECTIONS:
+                if force or name in dirty:
+                    self._config_data[name] = asdict(getattr(self, name))
+            self._config_data['last_updated'] = datetime.now().isoformat()
+            self._flat_config = None  # Las secciones pueden ser dicts nuevos
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._config_data, f, indent=2, ensure_ascii=False)
+            payload = _dump_json(self._config_data)
+            
+            await asyncio.to_thread(self._locked_io, _write_atomic, self.config_file, payload)
+            
+            # Solo tras escribir con éxito: si falla, el próximo guardado reintenta.
+            # Se conservan las claves marcadas mientras se escribía
+            self._dirty_sections -= dirty
             
             logger.info("✅ Configuración guardada")
             
@@ -233,20 +350,22 @@ class ConfigManager:
     async def load_themes(self):
         """Carga temas disponibles"""
         try:
-            self._themes = {}
+            paths = await asyncio.to_thread(lambda: list(self.themes_dir.glob("*.json")))
             
-            for theme_file in self.themes_dir.glob("*.json"):
-                try:
-                    with open(theme_file, 'r', encoding='utf-8') as f:
-                        theme_data = json.load(f)
-                    
-                    theme_name = theme_file.stem
-                    self._themes[theme_name] = theme_data
-                    
-                    logger.info(f"Tema cargado: {theme_name}")
-                    
-                except Exception as e:
-                    logger.error(f"Error cargando tema {theme_file}: {e}")
+            # Leer y parsear todos los temas en paralelo
+            results = await asyncio.gather(
+                *(asyncio.to_thread(_read_theme, theme_file) for theme_file in paths),
+                return_exceptions=True
+            )
+            
+            self._themes = {}
+            for theme_file, result in zip(paths, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error cargando tema {theme_file}: {result}")
+                    continue
+                theme_name, theme_data = result
+                self._themes[theme_name] = theme_data
+                logger.info(f"Tema cargado: {theme_name}")
             
             logger.info(f"✅ {len(self._themes)} temas cargados")
             
@@ -315,47 +434,45 @@ class ConfigManager:
             }
         }
         
-        for theme_name, theme_data in default_themes.items():
-            theme_file = self.themes_dir / f"{theme_name}.json"
-            
-            if not theme_file.exists():
-                try:
-                    with open(theme_file, 'w', encoding='utf-8') as f:
-                        json.dump(theme_data, f, indent=2, ensure_ascii=False)
-                    
-                    self._themes[theme_name] = theme_data
-                    logger.info(f"Tema por defecto creado: {theme_name}")
-                    
-                except Exception as e:
-                    logger.error(f"Error creando tema {theme_name}: {e}")
+        created = await asyncio.to_thread(_write_missing_themes, self.themes_dir, default_themes)
+        for theme_name in created:
+            self._themes[theme_name] = default_themes[theme_name]
     
     # Métodos de acceso a configuración
     def get(self, key: str, default: Any = None) -> Any:
         """Obtiene valor de configuración"""
-        keys = key.split('.')
-        value = self._config_data
-        
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        flat = self._flat_config
+        if flat is None:
+            flat = self._flat_config = {}
+            for k, v in self._config_data.items():
+                _flatten_into(flat, v, k)
+        return flat.get(key, default)
     
     def set(self, key: str, value: Any):
         """Establece valor de configuración"""
         keys = key.split('.')
         config = self._config_data
+        flat = self._flat_config
         
         # Navegar hasta el penúltimo nivel
-        for k in keys[:-1]:
+        for depth, k in enumerate(keys[:-1], 1):
             if k not in config:
                 config[k] = {}
+                if flat is not None:
+                    flat['.'.join(keys[:depth])] = config[k]
             config = config[k]
         
         # Establecer valor
         config[keys[-1]] = value
         
+        # Actualizar la vista plana: quitar los descendientes del valor anterior
+        if flat is not None:
+            prefix = key + '.'
+            for stale in [path for path in flat if path.startswith(prefix)]:
+                del flat[stale]
+            _flatten_into(flat, value, key)
+        self._dirty_sections.add(keys[0])
+        
         # Notificar cambio
         self._notify_change(key, value)
     
@@ -461,6 +578,7 @@ class ConfigManager:
             if backup_path.exists():
                 with open(backup_path, 'r', encoding='utf-8') as f:
                     self._config_data = json.load(f)
+                self._flat_config = None
                 
                 # Recargar configuraciones
                 await self.load_config()
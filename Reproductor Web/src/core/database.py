@@ -732,7 +732,14 @@ class DatabaseManager:
             return []
     
     async def add_play_history(self, track_id: str):
-        """Añade una pista al historial de reproducción"""
+        """Añade una pista al historial de reproducción
+        
+        El INSERT se ejecuta en un hilo para no bloquear el event loop.
+        """
+        await asyncio.to_thread(self._add_play_history_sync, track_id)
+    
+    def _add_play_history_sync(self, track_id: str):
+        """Inserta la reproducción en el historial (bloqueante)"""
         try:
             cursor = self.connection.cursor()
             
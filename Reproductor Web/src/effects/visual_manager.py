@@ -11,7 +11,9 @@ Sistema completo de efectos visuales con:
 """
 
 import numpy as np
+import tkinter as tk
 import matplotlib.pyplot as plt
+from matplotlib.colors import hsv_to_rgb
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.animation import FuncAnimation
 import asyncio
@@ -19,8 +21,7 @@ import threading
 import time
 from typing import Dict, List, Optional, Callable, Tuple
 import logging
-from dataclasses import dataclass
-import colorsys
+import functools
 import math
 
 try:
@@ -31,41 +32,48 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class Particle:
-    """Partícula para efectos visuales"""
-    x: float
-    y: float
-    vx: float
-    vy: float
-    size: float
-    color: Tuple[float, float, float]
-    life: float
-    max_life: float
-    
-    def update(self, dt: float, music_intensity: float = 0.0):
-        """Actualiza la partícula"""
-        # Movimiento
-        self.x += self.vx * dt
-        self.y += self.vy * dt
-        
-        # Reacción a la música
-        self.vx += np.random.uniform(-0.1, 0.1) * music_intensity
-        self.vy += np.random.uniform(-0.1, 0.1) * music_intensity
-        
-        # Reducir vida
-        self.life -= dt
-        
-        # Actualizar tamaño basado en vida
-        life_ratio = self.life / self.max_life
-        self.size = self.size * life_ratio
-    
-    def is_alive(self) -> bool:
-        """Verifica si la partícula está viva"""
-        return self.life > 0
+# Generador compartido; la API Generator tiene menos sobrecarga por llamada
+_rng = np.random.default_rng()
+
+@functools.lru_cache(maxsize=8)
+def _generate_palette(num_colors: int, saturation: float, value: float) -> np.ndarray:
+    """Genera una paleta (N, 3) de tonos equiespaciados.
+
+    El resultado se comparte entre instancias, así que se devuelve de
+    solo lectura.
+    """
+    hue = np.linspace(0, 1, num_colors, endpoint=False)
+    hsv = np.stack([hue, np.full_like(hue, saturation), np.full_like(hue, value)], axis=-1)
+    palette = hsv_to_rgb(hsv).astype(np.float32)
+    palette.flags.writeable = False
+    return palette
+
+# Tabla de tonos a saturación y brillo máximos para colorear partículas.
+# Para S y V dados, cada canal es V * (1 - S * (1 - canal)).
+_HUE_LUT_SIZE = 256
+_HUE_LUT = _generate_palette(_HUE_LUT_SIZE, 1.0, 1.0)
+
+def _blit_artists(fig, ax, background, artists) -> None:
+    """Redibuja solo los artistas animados sobre el fondo cacheado del eje"""
+    canvas = fig.canvas
+    if background is None:
+        # Aún no hay fondo: el draw completo lo captura vía draw_event
+        canvas.draw_idle()
+        return
+    canvas.restore_region(background)
+    for artist in artists:
+        ax.draw_artist(artist)
+    canvas.blit(ax.bbox)
 
 class SpectrumVisualizer:
-    """Visualizador de espectro 3D"""
+    """Visualizador de espectro 3D
+
+    Dibuja las barras en un tk.Canvas con un rectángulo por barra; cada
+    frame solo mueve sus coordenadas. El widget se crea bajo demanda con
+    ``create_canvas`` porque necesita una ventana raíz de Tk.
+    """
+    
+    ALPHA_LEVELS = 16  # Niveles de opacidad simulada (mezcla con el fondo negro)
     
     def __init__(self, width: int = 800, height: int = 400):
         self.width = width
@@ -76,101 +84,130 @@ class SpectrumVisualizer:
         self.num_bars = 64
         self.bar_heights = np.zeros(self.num_bars)
         self.bar_velocities = np.zeros(self.num_bars)
+        self._target_heights = np.zeros(self.num_bars)  # Buffer reutilizado por frame
         self.smoothing_factor = 0.8
         
+        # Canvas de Tk (se crea con create_canvas)
+        self.canvas: Optional[tk.Canvas] = None
+        self.rect_ids: List[int] = []
+        self._fill_levels = np.full(self.num_bars, -1, dtype=np.intp)
+        self._redraw_pending = False
+        
         # Colores
         self.color_palette = self._generate_color_palette()
+    
+    @property
+    def color_palette(self) -> np.ndarray:
+        """Paleta (N, 3) de las barras"""
+        return self._color_palette
+    
+    @color_palette.setter
+    def color_palette(self, palette: np.ndarray):
+        self._color_palette = palette
         
-        # Matplotlib setup
-        self.fig, self.ax = plt.subplots(figsize=(8, 4), facecolor='black')
-        self.ax.set_facecolor('black')
-        self.bars = None
-        
-        # Configurar estilo
-        self._setup_plot_style()
+        # Tk no tiene transparencia: se precalcula cada color mezclado con el
+        # fondo negro para cada nivel de opacidad (alpha = 0.3 + 0.7 * altura)
+        alphas = 0.3 + 0.7 * np.linspace(0, 1, self.ALPHA_LEVELS)
+        rgb = np.rint(np.asarray(palette)[:, None, :] * alphas[None, :, None] * 255).astype(int)
+        self._fill_lut = [['#%02x%02x%02x' % tuple(c) for c in bar] for bar in rgb.tolist()]
+        self._fill_levels[:] = -1  # Forzar recolorear en el próximo frame
     
-    def _generate_color_palette(self) -> List[Tuple[float, float, float]]:
+    def _generate_color_palette(self) -> np.ndarray:
         """Genera paleta de colores para el espectro"""
-        colors = []
-        for i in range(self.num_bars):
-            # HSV a RGB para colores vibrantes
-            hue = i / self.num_bars
-            saturation = 0.8
-            value = 0.9
-            rgb = colorsys.hsv_to_rgb(hue, saturation, value)
-            colors.append(rgb)
-        return colors
-    
-    def _setup_plot_style(self):
-        """Configura el estilo del gráfico"""
-        self.ax.set_xlim(0, self.num_bars)
-        self.ax.set_ylim(0, 1.0)
-        self.ax.set_xticks([])
-        self.ax.set_yticks([])
-        self.ax.spines['top'].set_visible(False)
-        self.ax.spines['right'].set_visible(False)
-        self.ax.spines['bottom'].set_visible(False)
-        self.ax.spines['left'].set_visible(False)
+        # HSV a RGB para colores vibrantes (cacheada por tamaño)
+        return _generate_palette(self.num_bars, 0.8, 0.9)
+    
+    def create_canvas(self, master=None) -> tk.Canvas:
+        """Crea (una sola vez) el canvas con un rectángulo por barra"""
+        if self.canvas is None:
+            self.canvas = tk.Canvas(master, width=self.width, height=self.height,
+                                    bg='black', highlightthickness=0)
+            self.rect_ids = [
+                self.canvas.create_rectangle(0, 0, 0, 0, fill=self._fill_lut[i][0], outline='')
+                for i in range(self.num_bars)
+            ]
+            self._fill_levels[:] = -1
+            self._redraw()
+        return self.canvas
+    
+    def _redraw(self):
+        """Mueve los rectángulos a la altura actual de cada barra"""
+        self._redraw_pending = False
+        canvas = self.canvas
+        if canvas is None:
+            return
+        
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        if width <= 1:  # Aún no mapeado: usar el tamaño solicitado
+            width, height = self.width, self.height
+        
+        # Barras al 80% del hueco, centradas (como el ancho por defecto de bar).
+        # Se recorta una copia: bar_heights conserva el estado del suavizado
+        slot = width / self.num_bars
+        left = (np.arange(self.num_bars) + 0.1) * slot
+        shown = np.clip(self.bar_heights, 0.0, 1.0)
+        tops = height * (1.0 - shown)
         
-        # Crear barras iniciales
-        self.bars = self.ax.bar(
-            range(self.num_bars),
-            self.bar_heights,
-            color=self.color_palette,
-            edgecolor='none',
-            alpha=0.8
-        )
+        for item, x0, y0 in zip(self.rect_ids, left.tolist(), tops.tolist()):
+            canvas.coords(item, x0, y0, x0 + 0.8 * slot, height)
+        
+        # Recolorear solo las barras cuyo nivel de opacidad ha cambiado
+        levels = np.rint(shown * (self.ALPHA_LEVELS - 1)).astype(np.intp)
+        for i in np.flatnonzero(levels != self._fill_levels).tolist():
+            canvas.itemconfigure(self.rect_ids[i], fill=self._fill_lut[i][levels[i]])
+        self._fill_levels[:] = levels
     
     def update_spectrum(self, spectrum_data: np.ndarray):
         """Actualiza el visualizador con nuevos datos de espectro"""
         if len(spectrum_data) == 0:
             return
         
-        # Reducir resolución si es necesario
+        # Reducir resolución si es necesario: promediar bloques de bins de una vez
+        spectrum_data = np.asarray(spectrum_data)
         if len(spectrum_data) > self.num_bars:
-            # Promediar bins para reducir a num_bars
             chunk_size = len(spectrum_data) // self.num_bars
-            reduced_spectrum = []
-            for i in range(self.num_bars):
-                start_idx = i * chunk_size
-                end_idx = min((i + 1) * chunk_size, len(spectrum_data))
-                chunk = spectrum_data[start_idx:end_idx]
-                reduced_spectrum.append(np.mean(chunk))
-            spectrum_data = np.array(reduced_spectrum)
+            trimmed = spectrum_data[:chunk_size * self.num_bars]
+            spectrum_data = trimmed.reshape(self.num_bars, chunk_size).mean(axis=1)
         
         # Normalizar datos
         spectrum_data = np.abs(spectrum_data)
-        if np.max(spectrum_data) > 0:
-            spectrum_data = spectrum_data / np.max(spectrum_data)
-        
-        # Suavizado
-        target_heights = spectrum_data[:self.num_bars]
-        
-        for i in range(self.num_bars):
-            # Interpolación suave
-            diff = target_heights[i] - self.bar_heights[i]
-            self.bar_velocities[i] = diff * 0.3
-            self.bar_heights[i] += self.bar_velocities[i]
-            
-            # Factor de amortiguamiento
-            self.bar_heights[i] *= 0.95
-            
-            # Actualizar barra visual
-            if self.bars:
-                self.bars[i].set_height(max(0, self.bar_heights[i]))
-                
-                # Color dinámico basado en intensidad
-                intensity = self.bar_heights[i]
-                base_color = self.color_palette[i]
-                alpha = 0.3 + intensity * 0.7
-                self.bars[i].set_alpha(alpha)
+        peak = spectrum_data.max()
+        if peak > 0:
+            spectrum_data = spectrum_data / peak
+        
+        # Suavizado (interpolación suave + amortiguamiento) sobre todas las barras
+        target_heights = self._target_heights
+        n = min(self.num_bars, len(spectrum_data))
+        target_heights[:n] = spectrum_data[:n]
+        target_heights[n:] = 0.0
+        
+        np.subtract(target_heights, self.bar_heights, out=self.bar_velocities)
+        self.bar_velocities *= 0.3
+        self.bar_heights += self.bar_velocities
+        self.bar_heights *= 0.95
+        
+        # Actualizar barras visuales: varias actualizaciones seguidas se
+        # agrupan en un solo redibujado cuando Tk quede libre
+        if self.canvas is not None and not self._redraw_pending:
+            try:
+                self.canvas.after_idle(self._redraw)
+                self._redraw_pending = True
+            except tk.TclError:
+                # El widget fue destruido
+                self.canvas = None
+                self.rect_ids = []
 
 class ParticleSystem:
-    """Sistema de partículas reactivo a música"""
+    """Sistema de partículas reactivo a música
+
+    Las partículas se guardan como estructura de arrays: un ndarray
+    float32 por campo, una máscara ``alive`` y una pila de índices libres.
+    Así la actualización por frame son unas pocas operaciones vectoriales
+    en lugar de un objeto Python por partícula.
+    """
     
     def __init__(self, max_particles: int = 500):
-        self.max_particles = max_particles
-        self.particles: List[Particle] = []
         self.spawn_rate = 10  # partículas por segundo
         self.last_spawn_time = 0
         
@@ -178,6 +215,50 @@ class ParticleSystem:
         self.gravity = -9.8
         self.wind_force = 0.0
         self.music_reactivity = 1.0
+        
+        self._rng = _rng
+        self._capacity = 0
+        self._resize(max_particles)
+    
+    @property
+    def max_particles(self) -> int:
+        """Capacidad máxima de partículas"""
+        return self._capacity
+    
+    @max_particles.setter
+    def max_particles(self, value: int):
+        if value != self._capacity:
+            self._resize(value)
+    
+    @property
+    def particle_count(self) -> int:
+        """Número de partículas vivas"""
+        return self._capacity - len(self._free_indices)
+    
+    def _resize(self, capacity: int):
+        """Reserva los buffers conservando las partículas vivas"""
+        fields = ('x', 'y', 'vx', 'vy', 'size', 'r', 'g', 'b', 'life', 'max_life')
+        
+        if self._capacity:
+            keep = np.flatnonzero(self.alive)[:capacity]
+        else:
+            keep = np.empty(0, dtype=np.intp)
+        n_keep = len(keep)
+        
+        for name in fields:
+            buffer = np.zeros(capacity, dtype=np.float32)
+            if n_keep:
+                buffer[:n_keep] = getattr(self, name)[keep]
+            setattr(self, name, buffer)
+        
+        # max_life a 1 en huecos libres para que life / max_life no divida por cero
+        self.max_life[n_keep:] = 1.0
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.alive[:n_keep] = True
+        
+        # Pila de índices libres: el siguiente en salir es el más bajo
+        self._free_indices: List[int] = list(range(capacity - 1, n_keep - 1, -1))
+        self._capacity = capacity
     
     def update(self, dt: float, music_intensity: float = 0.0, spawn_position: Tuple[float, float] = (0.5, 0.5)):
         """Actualiza el sistema de partículas"""
@@ -185,76 +266,106 @@ class ParticleSystem:
         
         # Generar nuevas partículas
         if current_time - self.last_spawn_time > 1.0 / (self.spawn_rate * (1 + music_intensity)):
-            if len(self.particles) < self.max_particles:
+            if self._free_indices:
                 self._spawn_particle(spawn_position, music_intensity)
             self.last_spawn_time = current_time
         
-        # Actualizar partículas existentes
-        for particle in self.particles[:]:
-            particle.update(dt, music_intensity)
-            
-            # Aplicar fuerzas
-            particle.vy += self.gravity * dt * 0.01
-            particle.vx += self.wind_force * dt
-            
-            # Eliminar partículas muertas
-            if not particle.is_alive() or particle.y < -0.1:
-                self.particles.remove(particle)
+        alive = self.alive
+        if not alive.any():
+            return
+        
+        # Movimiento (los huecos libres también se integran, pero se ignoran)
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        
+        # Reacción a la música: una sola extracción para todas las partículas
+        if music_intensity:
+            jitter = self._rng.random((2, self._capacity), dtype=np.float32)
+            jitter -= 0.5
+            jitter *= 0.2 * music_intensity  # uniforme en [-0.1, 0.1) * intensidad
+            self.vx += jitter[0]
+            self.vy += jitter[1]
+        
+        # Reducir vida y escalar tamaño según la vida restante
+        self.life -= dt
+        self.size *= self.life / self.max_life
+        
+        # Aplicar fuerzas
+        self.vy += self.gravity * dt * 0.01
+        self.vx += self.wind_force * dt
+        
+        # Liberar partículas muertas
+        dead = alive & ((self.life <= 0) | (self.y < -0.1))
+        if dead.any():
+            alive &= ~dead
+            self._free_indices.extend(np.flatnonzero(dead).tolist())
     
     def _spawn_particle(self, position: Tuple[float, float], music_intensity: float):
         """Genera una nueva partícula"""
+        self._spawn_particles(position, music_intensity, 1)
+    
+    def _spawn_particles(self, position: Tuple[float, float], music_intensity: float, count: int):
+        """Genera hasta ``count`` partículas con una extracción aleatoria por campo"""
+        count = min(count, len(self._free_indices))
+        if count <= 0:
+            return
+        
+        idx = np.array(self._free_indices[-count:], dtype=np.intp)
+        del self._free_indices[-count:]
         x, y = position
+        rng = self._rng
         
         # Velocidad aleatoria con influencia musical
         base_speed = 0.1 + music_intensity * 0.3
-        angle = np.random.uniform(0, 2 * np.pi)
-        speed = np.random.uniform(base_speed * 0.5, base_speed * 1.5)
+        angle = rng.uniform(0, 2 * np.pi, count)
+        speed = rng.uniform(base_speed * 0.5, base_speed * 1.5, count)
         
-        vx = np.cos(angle) * speed
-        vy = np.sin(angle) * speed + 0.2  # Tendencia hacia arriba
+        self.vx[idx] = np.cos(angle) * speed
+        self.vy[idx] = np.sin(angle) * speed + 0.2  # Tendencia hacia arriba
         
         # Tamaño basado en intensidad musical
-        size = 0.002 + music_intensity * 0.008
+        self.size[idx] = 0.002 + music_intensity * 0.008
         
         # Color aleatorio con saturación basada en música
-        hue = np.random.random()
         saturation = 0.5 + music_intensity * 0.5
         value = 0.8 + music_intensity * 0.2
-        color = colorsys.hsv_to_rgb(hue, saturation, value)
+        rgb = _HUE_LUT[rng.integers(0, _HUE_LUT_SIZE, count)]
+        rgb = value * (1.0 - saturation * (1.0 - rgb))
+        self.r[idx] = rgb[:, 0]
+        self.g[idx] = rgb[:, 1]
+        self.b[idx] = rgb[:, 2]
         
         # Vida de la partícula
-        life = np.random.uniform(1.0, 3.0 + music_intensity * 2.0)
-        
-        particle = Particle(
-            x=x + np.random.uniform(-0.05, 0.05),
-            y=y + np.random.uniform(-0.02, 0.02),
-            vx=vx,
-            vy=vy,
-            size=size,
-            color=color,
-            life=life,
-            max_life=life
-        )
-        
-        self.particles.append(particle)
-    
-    def get_particle_data(self) -> List[Dict]:
-        """Obtiene datos de partículas para renderizado"""
-        particle_data = []
+        life = rng.uniform(1.0, 3.0 + music_intensity * 2.0, count)
+        self.life[idx] = life
+        self.max_life[idx] = life
         
-        for particle in self.particles:
-            life_ratio = particle.life / particle.max_life
-            alpha = life_ratio * 0.8
-            
-            particle_data.append({
-                'x': particle.x,
-                'y': particle.y,
-                'size': particle.size,
-                'color': (*particle.color, alpha),
-                'life_ratio': life_ratio
-            })
-        
-        return particle_data
+        self.x[idx] = x + rng.uniform(-0.05, 0.05, count)
+        self.y[idx] = y + rng.uniform(-0.02, 0.02, count)
+        self.alive[idx] = True
+    
+    def get_particle_data(self) -> Dict[str, np.ndarray]:
+        """Obtiene datos de partículas para renderizado
+
+        Devuelve arrays alineados con las partículas vivas: ``x``, ``y``,
+        ``size``, ``life_ratio`` (N,) y ``color`` (N, 4) en RGBA.
+        """
+        idx = np.flatnonzero(self.alive)
+        life_ratio = self.life[idx] / self.max_life[idx]
+        
+        color = np.empty((len(idx), 4), dtype=np.float32)
+        color[:, 0] = self.r[idx]
+        color[:, 1] = self.g[idx]
+        color[:, 2] = self.b[idx]
+        color[:, 3] = life_ratio * 0.8
+        
+        return {
+            'x': self.x[idx],
+            'y': self.y[idx],
+            'size': self.size[idx],
+            'color': color,
+            'life_ratio': life_ratio
+        }
 
 class WaveformVisualizer:
     """Visualizador de forma de onda"""
@@ -267,9 +378,24 @@ class WaveformVisualizer:
         # Configuración matplotlib
         self.fig, self.ax = plt.subplots(figsize=(8, 2), facecolor='black')
         self.ax.set_facecolor('black')
-        self.line, = self.ax.plot([], [], color='#00d4ff', linewidth=2, alpha=0.8)
+        
+        # Blitting: el fondo del eje se cachea y solo se redibuja la línea
+        self._blit_enabled = getattr(self.fig.canvas, 'supports_blit', False)
+        self._background = None
+        
+        self.line, = self.ax.plot([], [], color='#00d4ff', linewidth=2, alpha=0.8,
+                                  animated=self._blit_enabled)
         
         self._setup_plot_style()
+        
+        # El fondo se captura en el primer draw_event (sin dibujado anticipado)
+        if self._blit_enabled:
+            self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+    
+    def _on_draw(self, event):
+        """Recaptura el fondo tras un redibujado completo (inicio, resize, nuevo canvas)"""
+        self._background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
     
     def _setup_plot_style(self):
         """Configura estilo del gráfico"""
@@ -296,6 +422,9 @@ class WaveformVisualizer:
             # Actualizar línea
             x_data = range(len(windowed_data))
             self.line.set_data(x_data, windowed_data)
+            
+            if self._blit_enabled:
+                _blit_artists(self.fig, self.ax, self._background, (self.line,))
 
 class VisualEffectsManager:
     """Gestor principal de efectos visuales"""
@@ -433,10 +562,10 @@ class VisualEffectsManager:
         except Exception as e:
             logger.error(f"Error actualizando forma de onda: {e}")
     
-    def get_spectrum_canvas(self) -> Optional[FigureCanvasTkAgg]:
-        """Obtiene canvas de matplotlib para el espectro"""
-        if self.spectrum_visualizer and self.spectrum_visualizer.fig:
-            return FigureCanvasTkAgg(self.spectrum_visualizer.fig)
+    def get_spectrum_canvas(self, master=None) -> Optional[tk.Canvas]:
+        """Obtiene el canvas de Tk del espectro"""
+        if self.spectrum_visualizer:
+            return self.spectrum_visualizer.create_canvas(master)
         return None
     
     def get_waveform_canvas(self) -> Optional[FigureCanvasTkAgg]:
@@ -445,11 +574,11 @@ class VisualEffectsManager:
             return FigureCanvasTkAgg(self.waveform_visualizer.fig)
         return None
     
-    def get_particle_data(self) -> List[Dict]:
+    def get_particle_data(self) -> Dict[str, np.ndarray]:
         """Obtiene datos de partículas para renderizado"""
         if self.particle_system:
             return self.particle_system.get_particle_data()
-        return []
+        return {}
     
     def set_visualization_mode(self, mode: str):
         """Establece modo de visualización"""
@@ -485,8 +614,7 @@ class VisualEffectsManager:
         """Trigger efecto de explosión de partículas"""
         if self.particle_system:
             # Generar múltiples partículas en burst
-            for _ in range(50):
-                self.particle_system._spawn_particle(position, 1.0)
+            self.particle_system._spawn_particles(position, 1.0, 50)
     
     def set_color_palette(self, palette_name: str):
         """Establece paleta de colores"""
@@ -544,8 +672,8 @@ class VisualEffectsManager:
         """Actualiza los datos del espectro (versión async)"""
         try:
             if spectrum_data is not None and self.visualization_enabled:
-                # Actualizar datos del espectro para la visualización
-                self.current_spectrum = spectrum_data
+                # Copia: el motor reutiliza el buffer del frame
+                self.current_spectrum = np.array(spectrum_data, dtype=np.float32)
                 
         except Exception as e:
             logger.error(f"Error actualizando espectro: {e}")
@@ -554,8 +682,8 @@ class VisualEffectsManager:
         """Actualiza los datos del espectro (versión sincrónica)"""
         try:
             if spectrum_data is not None and self.visualization_enabled:
-                # Actualizar datos del espectro para la visualización
-                self.current_spectrum = spectrum_data
+                # Copia: el motor reutiliza el buffer del frame
+                self.current_spectrum = np.array(spectrum_data, dtype=np.float32)
                 
                 # Actualizar visualizador si existe
                 if hasattr(self, 'visualizer_frame') and self.visualizer_frame:
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+🔤 FONTS - FUENTES COMPARTIDAS
+==============================
+Caché de instancias CTkFont reutilizadas por todos los componentes
+"""
+
+import functools
+
+import customtkinter as ctk
+
+@functools.lru_cache(maxsize=32)
+def get_font(size: int, weight: str = "normal") -> ctk.CTkFont:
+    """Obtiene una fuente compartida para el tamaño y peso indicados.
+
+    Crear un CTkFont reserva recursos de fuente en Tk, así que se crea
+    una sola instancia por combinación y se reutiliza entre widgets.
+    Debe llamarse después de crear la ventana raíz.
+    """
+    return ctk.CTkFont(size=size, weight=weight)
@@ -10,6 +10,8 @@ import tkinter as tk
 from tkinter import ttk
 from typing import Callable, List, Optional
 
+from .fonts import get_font
+
 class LibraryBrowser(ctk.CTkFrame):
     """Widget para navegar la biblioteca musical"""
     
@@ -29,7 +31,7 @@ class LibraryBrowser(ctk.CTkFrame):
         self.title_label = ctk.CTkLabel(
             self,
             text="📚 Biblioteca Musical",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=get_font(16, "bold")
         )
         self.title_label.pack(pady=(10, 5))
         
@@ -98,7 +100,7 @@ class LibraryBrowser(ctk.CTkFrame):
         self.info_label = ctk.CTkLabel(
             self.info_frame,
             text="Cargando biblioteca...",
-            font=ctk.CTkFont(size=10)
+            font=get_font(10)
         )
         self.info_label.pack(pady=5)
     
@@ -9,6 +9,16 @@ import customtkinter as ctk
 import tkinter as tk
 from typing import Callable, Optional
 
+from .fonts import get_font
+
+# Transiciones del modo de repetición y su estilo (texto, color)
+_REPEAT_NEXT = {"none": "one", "one": "all", "all": "none"}
+_REPEAT_STYLE = {
+    "none": ("🔁", "transparent"),
+    "one": ("🔂", "#1f538d"),
+    "all": ("🔁", "#1f538d"),
+}
+
 class PlayerControls(ctk.CTkFrame):
     """Widget de controles del reproductor"""
     
@@ -23,6 +33,7 @@ class PlayerControls(ctk.CTkFrame):
         self.seek_callback = seek_callback
         
         self.is_playing = False
+        self._current_state = None  # Último estado pintado en el botón
         self.shuffle_enabled = False
         self.repeat_mode = "none"  # none, one, all
         
@@ -43,7 +54,7 @@ class PlayerControls(ctk.CTkFrame):
             text="⏮",
             width=50,
             height=40,
-            font=ctk.CTkFont(size=16),
+            font=get_font(16),
             command=self.previous_callback
         )
         self.prev_button.pack(side="left", padx=5)
@@ -54,7 +65,7 @@ class PlayerControls(ctk.CTkFrame):
             text="▶",
             width=60,
             height=50,
-            font=ctk.CTkFont(size=20),
+            font=get_font(20),
             command=self.play_pause_callback
         )
         self.play_pause_button.pack(side="left", padx=10)
@@ -65,7 +76,7 @@ class PlayerControls(ctk.CTkFrame):
             text="⏭",
             width=50,
             height=40,
-            font=ctk.CTkFont(size=16),
+            font=get_font(16),
             command=self.next_callback
         )
         self.next_button.pack(side="left", padx=5)
@@ -76,7 +87,7 @@ class PlayerControls(ctk.CTkFrame):
             text="🔀",
             width=40,
             height=40,
-            font=ctk.CTkFont(size=14),
+            font=get_font(14),
             command=self._toggle_shuffle
         )
         self.shuffle_button.pack(side="left", padx=(20, 5))
@@ -87,20 +98,29 @@ class PlayerControls(ctk.CTkFrame):
             text="🔁",
             width=40,
             height=40,
-            font=ctk.CTkFont(size=14),
+            font=get_font(14),
             command=self._toggle_repeat
         )
         self.repeat_button.pack(side="left", padx=5)
     
     def update_state(self, state: str):
         """Actualiza el estado visual de los controles"""
+        # "paused" y "stopped" se pintan igual
+        if state == "paused":
+            state = "stopped"
+        if state == self._current_state:
+            return
+        
         if state == "playing":
             self.is_playing = True
+            self._current_state = state
             self.play_pause_button.configure(text="⏸")
-        elif state in ["paused", "stopped"]:
+        elif state == "stopped":
             self.is_playing = False
+            self._current_state = state
             self.play_pause_button.configure(text="▶")
         elif state == "loading":
+            self._current_state = state
             self.play_pause_button.configure(text="⏳")
     
     def _toggle_shuffle(self):
@@ -113,16 +133,9 @@ class PlayerControls(ctk.CTkFrame):
     
     def _toggle_repeat(self):
         """Alterna modo de repetición"""
-        modes = ["none", "one", "all"]
-        current_idx = modes.index(self.repeat_mode)
-        self.repeat_mode = modes[(current_idx + 1) % len(modes)]
-        
-        if self.repeat_mode == "none":
-            self.repeat_button.configure(text="🔁", fg_color="transparent")
-        elif self.repeat_mode == "one":
-            self.repeat_button.configure(text="🔂", fg_color="#1f538d")
-        elif self.repeat_mode == "all":
-            self.repeat_button.configure(text="🔁", fg_color="#1f538d")
+        self.repeat_mode = _REPEAT_NEXT[self.repeat_mode]
+        text, color = _REPEAT_STYLE[self.repeat_mode]
+        self.repeat_button.configure(text=text, fg_color=color)
     
     def _create_progress_bar(self):
         """Crea la barra de progreso"""
@@ -130,10 +143,14 @@ class PlayerControls(ctk.CTkFrame):
         self.progress_frame = ctk.CTkFrame(self.master)
         self.progress_frame.pack(fill="x", padx=10, pady=(0, 10))
         
+        # Variables de texto de los tiempos
+        self._cur_var = tk.StringVar(master=self, value="0:00")
+        self._tot_var = tk.StringVar(master=self, value="0:00")
+        
         # Tiempo actual
         self.current_time_label = ctk.CTkLabel(
             self.progress_frame, 
-            text="0:00",
+            textvariable=self._cur_var,
             width=50
         )
         self.current_time_label.pack(side="left", padx=(10, 5))
@@ -153,7 +170,7 @@ class PlayerControls(ctk.CTkFrame):
         # Tiempo total
         self.total_time_label = ctk.CTkLabel(
             self.progress_frame,
-            text="0:00",
+            textvariable=self._tot_var,
             width=50
         )
         self.total_time_label.pack(side="right", padx=(5, 10))
@@ -177,7 +194,7 @@ class PlayerControls(ctk.CTkFrame):
             # Actualizar tiempo mostrado mientras arrastra
             seek_time = (value / 100.0) * self.total_duration
             time_str = self._format_time(seek_time)
-            self.current_time_label.configure(text=time_str)
+            self._cur_var.set(time_str)
     
     def update_progress(self, current_time: float, total_time: float):
         """Actualiza la barra de progreso"""
@@ -186,8 +203,8 @@ class PlayerControls(ctk.CTkFrame):
             self.total_duration = total_time
             
             # Actualizar etiquetas de tiempo
-            self.current_time_label.configure(text=self._format_time(current_time))
-            self.total_time_label.configure(text=self._format_time(total_time))
+            self._cur_var.set(self._format_time(current_time))
+            self._tot_var.set(self._format_time(total_time))
             
             # Actualizar slider
             if total_time > 0:
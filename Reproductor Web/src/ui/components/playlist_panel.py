@@ -10,9 +10,16 @@ import tkinter as tk
 from tkinter import ttk
 from typing import Callable, List, Optional
 
+from .fonts import get_font
+
 class PlaylistPanel(ctk.CTkFrame):
     """Widget del panel de playlist"""
     
+    # Menú contextual compartido por todas las instancias; sus comandos
+    # actúan sobre el panel donde se abrió por última vez
+    _shared_menu: Optional[tk.Menu] = None
+    _active: Optional["PlaylistPanel"] = None
+    
     def __init__(self, parent, track_selected_callback: Callable):
         super().__init__(parent)
         
@@ -20,10 +27,36 @@ class PlaylistPanel(ctk.CTkFrame):
         self.current_playlist = []
         self.current_index = 0
         
-        self._create_panel()
+        # La lista (Treeview) y el menú se construyen al mostrarse el panel
+        self._built = False
+        self._pending_playlist = False
+        
+        self._create_header()
+        # tk.Misc.bind directamente: CTkFrame.bind no devuelve el id ni
+        # permite unbind por id, y el handler se quita tras construir
+        self._map_bind_id = tk.Misc.bind(self, "<Map>", self._ensure_built, "+")
+    
+    def _ensure_built(self, event=None):
+        """Construye la lista y el menú la primera vez que se muestra el panel"""
+        if self._built:
+            return
+        self._built = True
+        
+        # Construcción única: dejar de escuchar <Map>
+        if self._map_bind_id is not None:
+            tk.Misc.unbind(self, "<Map>", self._map_bind_id)
+            self._map_bind_id = None
+        
+        self._create_list()
+        self._create_context_menu()
+        
+        # Aplicar cambios recibidos antes de construir la lista
+        if self._pending_playlist:
+            self._pending_playlist = False
+            self._populate_tree()
     
-    def _create_panel(self):
-        """Crea el panel de playlist"""
+    def _create_header(self):
+        """Crea la cabecera del panel (título y botones)"""
         
         # Título y controles
         self.header_frame = ctk.CTkFrame(self)
@@ -32,7 +65,7 @@ class PlaylistPanel(ctk.CTkFrame):
         self.title_label = ctk.CTkLabel(
             self.header_frame,
             text="🎵 Lista de Reproducción",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=get_font(16, "bold")
         )
         self.title_label.pack(side="left", padx=5, pady=5)
         
@@ -45,7 +78,7 @@ class PlaylistPanel(ctk.CTkFrame):
             text="🗑",
             width=30,
             height=30,
-            font=ctk.CTkFont(size=12),
+            font=get_font(12),
             command=self._clear_playlist
         )
         self.clear_button.pack(side="right", padx=2)
@@ -55,10 +88,13 @@ class PlaylistPanel(ctk.CTkFrame):
             text="💾",
             width=30,
             height=30,
-            font=ctk.CTkFont(size=12),
+            font=get_font(12),
             command=self._save_playlist
         )
         self.save_button.pack(side="right", padx=2)
+    
+    def _create_list(self):
+        """Crea la lista de pistas y el frame de información"""
         
         # Frame para la lista
         self.list_frame = ctk.CTkFrame(self)
@@ -98,25 +134,28 @@ class PlaylistPanel(ctk.CTkFrame):
         self.info_frame = ctk.CTkFrame(self)
         self.info_frame.pack(fill="x", padx=10, pady=(0, 10))
         
+        self._info_var = tk.StringVar(master=self, value="Lista vacía - Añade música")
         self.info_label = ctk.CTkLabel(
             self.info_frame,
-            text="Lista vacía - Añade música",
-            font=ctk.CTkFont(size=10)
+            textvariable=self._info_var,
+            font=get_font(10)
         )
         self.info_label.pack(pady=5)
-        
-        # Crear menú contextual
-        self._create_context_menu()
     
     def _create_context_menu(self):
-        """Crea el menú contextual"""
-        self.context_menu = tk.Menu(self, tearoff=0)
-        self.context_menu.add_command(label="Reproducir", command=self._play_selected)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="Mover arriba", command=self._move_up)
-        self.context_menu.add_command(label="Mover abajo", command=self._move_down)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="Eliminar", command=self._remove_selected)
+        """Crea (una sola vez) el menú contextual compartido"""
+        cls = PlaylistPanel
+        if cls._shared_menu is None:
+            menu = tk.Menu(self.winfo_toplevel(), tearoff=0)
+            menu.add_command(label="Reproducir", command=lambda: cls._active._play_selected())
+            menu.add_separator()
+            menu.add_command(label="Mover arriba", command=lambda: cls._active._move_up())
+            menu.add_command(label="Mover abajo", command=lambda: cls._active._move_down())
+            menu.add_separator()
+            menu.add_command(label="Eliminar", command=lambda: cls._active._remove_selected())
+            cls._shared_menu = menu
+        
+        self.context_menu = cls._shared_menu
     
     def update_playlist(self, playlist: List, current_index: int = 0):
         """Actualiza la playlist completa"""
@@ -145,6 +184,10 @@ class PlaylistPanel(ctk.CTkFrame):
     
     def _populate_tree(self):
         """Llena el árbol con la playlist actual"""
+        if not self._built:
+            self._pending_playlist = True
+            return
+        
         # Limpiar árbol
         for item in self.tree.get_children():
             self.tree.delete(item)
@@ -171,16 +214,17 @@ class PlaylistPanel(ctk.CTkFrame):
                 self.tree.selection_set(item)
                 self.tree.see(item)
         
-        # Actualizar información
+        self._update_info()
+    
+    def _update_info(self):
+        """Actualiza la etiqueta de información de la playlist"""
         count = len(self.current_playlist)
         if count > 0:
             total_duration = sum(track.duration for track in self.current_playlist)
             total_duration_str = self._format_duration(total_duration)
-            self.info_label.configure(
-                text=f"{count} pistas - {total_duration_str}"
-            )
+            self._info_var.set(f"{count} pistas - {total_duration_str}")
         else:
-            self.info_label.configure(text="Lista vacía - Añade música")
+            self._info_var.set("Lista vacía - Añade música")
     
     def _format_duration(self, seconds: float) -> str:
         """Formatea la duración en mm:ss"""
@@ -205,6 +249,7 @@ class PlaylistPanel(ctk.CTkFrame):
         item = self.tree.identify_row(event.y)
         if item:
             self.tree.selection_set(item)
+            PlaylistPanel._active = self
             self.context_menu.post(event.x_root, event.y_root)
     
     def _play_selected(self):
@@ -267,20 +312,51 @@ class PlaylistPanel(ctk.CTkFrame):
     def _remove_selected(self):
         """Elimina las pistas seleccionadas"""
         selection = self.tree.selection()
-        if selection:
-            # Obtener índices a eliminar (en orden descendente)
-            indices = []
-            for item in selection:
-                tags = self.tree.item(item, "tags")
-                if tags:
-                    indices.append(int(tags[0]))
-            
-            # Ordenar en orden descendente para eliminar correctamente
-            indices.sort(reverse=True)
-            
-            for index in indices:
+        if not selection:
+            return
+        
+        # Índice -> item del árbol de las pistas a eliminar
+        removed = {}
+        for item in selection:
+            tags = self.tree.item(item, "tags")
+            if tags:
+                index = int(tags[0])
                 if 0 <= index < len(self.current_playlist):
-                    self.remove_track(index)
+                    removed[index] = item
+        
+        if not removed:
+            return
+        
+        previous_track = None
+        if 0 <= self.current_index < len(self.current_playlist):
+            previous_track = self.current_playlist[self.current_index]
+        
+        # Una sola llamada a Tcl para borrar todas las filas
+        self.tree.delete(*removed.values())
+        self.current_playlist = [
+            track for i, track in enumerate(self.current_playlist) if i not in removed
+        ]
+        
+        # Mismo ajuste que remove_track aplicado en orden descendente
+        for index in sorted(removed, reverse=True):
+            if self.current_index >= index and self.current_index > 0:
+                self.current_index -= 1
+        
+        # Reindexar solo las filas posteriores a la primera eliminada
+        items = self.tree.get_children()
+        for i in range(min(removed), len(items)):
+            self.tree.item(items[i], tags=(str(i),))
+        
+        # Si la pista actual fue eliminada, marcar la nueva
+        if 0 <= self.current_index < len(items):
+            track = self.current_playlist[self.current_index]
+            if track is not previous_track:
+                item = items[self.current_index]
+                self.tree.item(item, text=f"🎵 {track.title}")
+                self.tree.selection_set(item)
+                self.tree.see(item)
+        
+        self._update_info()
     
     def _clear_playlist(self):
         """Limpia la playlist"""
@@ -297,6 +373,9 @@ class PlaylistPanel(ctk.CTkFrame):
     
     def get_selected_indices(self):
         """Obtiene los índices de las pistas seleccionadas"""
+        if not self._built:
+            return []
+        
         selection = self.tree.selection()
         indices = []
         
@@ -309,7 +388,7 @@ class PlaylistPanel(ctk.CTkFrame):
     
     def select_track(self, index: int):
         """Selecciona una pista por índice"""
-        if 0 <= index < len(self.current_playlist):
+        if self._built and 0 <= index < len(self.current_playlist):
             items = self.tree.get_children()
             if index < len(items):
                 item = items[index]
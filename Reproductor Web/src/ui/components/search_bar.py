@@ -10,6 +10,8 @@ from typing import Callable
 import threading
 import time
 
+from .fonts import get_font
+
 class SearchBar(ctk.CTkFrame):
     """Widget de barra de búsqueda"""
     
@@ -29,7 +31,7 @@ class SearchBar(ctk.CTkFrame):
         self.search_icon = ctk.CTkLabel(
             self,
             text="🔍",
-            font=ctk.CTkFont(size=16)
+            font=get_font(16)
         )
         self.search_icon.pack(side="left", padx=(10, 5))
         
@@ -52,7 +54,7 @@ class SearchBar(ctk.CTkFrame):
             text="✕",
             width=30,
             height=35,
-            font=ctk.CTkFont(size=12),
+            font=get_font(12),
             command=self._clear_search
         )
         self.clear_button.pack(side="left", padx=(5, 10))
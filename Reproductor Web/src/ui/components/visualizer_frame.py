@@ -15,19 +15,142 @@ import threading
 import time
 from typing import Optional
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+from .fonts import get_font
+
+if NUMBA_AVAILABLE:
+    # Firmas explícitas: se compilan al importar y el primer frame no espera al JIT
+    
+    @njit("void(float32[:], int64, float32[:])", cache=True, fastmath=True)
+    def _smooth_kernel(data, window, out):
+        """Media móvil de ventana impar en una sola pasada"""
+        n = data.size
+        h = window // 2
+        inv = 1.0 / window
+        acc = 0.0
+        for i in range(window):
+            acc += data[i]
+        for i in range(h, n - h):
+            out[i] = acc * inv
+            if i + h + 1 < n:
+                acc += data[i + h + 1] - data[i - h]
+        for i in range(h):
+            out[i] = data[i]
+            out[n - 1 - i] = data[n - 1 - i]
+    
+    @njit("int64(float32[:], float64, int64, float32[:])", cache=True, fastmath=True)
+    def _waveform_kernel(sin_table, level, state, out):
+        """Onda senoidal escalada con ruido LCG; devuelve el nuevo estado"""
+        noise_scale = 0.1 * level / 2147483648.0
+        for i in range(sin_table.size):
+            state = (state * 1103515245 + 12345) & 0x7FFFFFFF
+            out[i] = sin_table[i] * level + state * noise_scale + 0.5
+        return state
+    
+    @njit("float64(float32[:], float32[:])", cache=True, fastmath=True)
+    def _normalize_kernel(data, out):
+        """Normaliza por el máximo (sin cambios si el máximo no es positivo)
+        y devuelve la suma del resultado; máximo y suma en una sola pasada"""
+        max_val = 0.0
+        total = 0.0
+        for i in range(data.size):
+            v = data[i]
+            total += v
+            if v > max_val:
+                max_val = v
+        scale = 1.0 / max_val if max_val > 0.0 else 1.0
+        for i in range(data.size):
+            out[i] = data[i] * scale
+        return total * scale
+    
+    @njit("void(float32[:], float32[:], float64)", cache=True, fastmath=True)
+    def _band_kernel(spectrum, out, scale):
+        """Suma el espectro por bandas y aplica escala logarítmica"""
+        width = spectrum.size // out.size
+        for b in range(out.size):
+            acc = 0.0
+            for k in range(b * width, (b + 1) * width):
+                acc += spectrum[k]
+            out[b] = np.log1p(acc) * scale
+
+def _simplify_line_path(line, threshold: float):
+    """Activa la simplificación de trazos solo para ``line``
+    
+    Line2D crea un Path nuevo cada vez que cambian sus datos y lo configura
+    con rcParams; en lugar de tocar los rcParams globales (que afectarían a
+    todas las figuras del proceso) se ajusta cada Path recién creado.
+    Con 512 puntos en el ancho del canvas, Agg procesa muchos menos vértices.
+    """
+    recache = line.recache
+    
+    def recache_simplified(always=False):
+        recache(always=always)
+        path = line.get_path()
+        path.should_simplify = True
+        path.simplify_threshold = threshold
+    
+    line.recache = recache_simplified
+    line.recache(always=True)
+
 class VisualizerFrame(ctk.CTkFrame):
     """Frame del visualizador de música"""
     
+    SMOOTH_WINDOW = 3  # Tamaño (impar) de la media móvil del espectro
+    PATH_SIMPLIFY_THRESHOLD = 0.3  # Simplificación de las líneas (rc por defecto: 1/9)
+    
     def __init__(self, parent, visual_manager):
         super().__init__(parent)
         
         self.visual_manager = visual_manager
         self.is_active = False
-        self.spectrum_data = np.zeros(512)
+        
+        # Doble buffer del espectro: el hilo de audio escribe en el buffer
+        # trasero y publica cambiando el índice (asignación atómica en CPython)
+        self._buffers = (np.zeros(512, dtype=np.float32),
+                         np.zeros(512, dtype=np.float32))
+        self._read_idx = 0
+        
+        # Media de cada buffer, calculada al publicarlo para no repetir
+        # la reducción en cada frame
+        self._levels = [0.0, 0.0]
+        
+        # Buffers reutilizados por el suavizado
+        self._smooth_cumsum = np.zeros(513, dtype=np.float32)
+        self._smooth_out = np.empty(512, dtype=np.float32)
+        
+        # Tabla senoidal y estado del generador de ruido de la forma de onda
+        self._sin_table = np.sin(np.linspace(0, 4*np.pi, 512)).astype(np.float32)
+        self._wave_out = np.empty(512, dtype=np.float32)
+        self._rand_state = 12345
+        
+        # Ruido precalculado para la forma de onda sin Numba: se recorre con
+        # un paso primo para que no se note la repetición
+        self._noise_pool = np.random.random(8192).astype(np.float32)
+        self._noise_off = 0
+        self._noise_buf = np.empty(512, dtype=np.float32)
+        
+        # Potencia por banda de la vista de barras (64 bandas de 8 muestras)
+        self._band_buf = np.empty(64, dtype=np.float32)
+        self._band_scale = 1.0 / np.log1p(8.0)
         
         self._create_visualizer()
         self._setup_animation()
     
+    @property
+    def spectrum_data(self) -> np.ndarray:
+        """Buffer del espectro publicado más recientemente"""
+        return self._buffers[self._read_idx]
+    
+    @property
+    def spectrum_level(self) -> float:
+        """Media del buffer del espectro publicado"""
+        return self._levels[self._read_idx]
+    
     def _create_visualizer(self):
         """Crea el visualizador"""
         
@@ -35,7 +158,7 @@ class VisualizerFrame(ctk.CTkFrame):
         self.title_label = ctk.CTkLabel(
             self,
             text="🎨 Visualizador Musical",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=get_font(16, "bold")
         )
         self.title_label.pack(pady=(10, 5))
         
@@ -84,17 +207,78 @@ class VisualizerFrame(ctk.CTkFrame):
         self.canvas = FigureCanvasTkAgg(self.fig, self.canvas_frame)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
         
-        # Inicializar línea del espectro
+        # Inicializar línea del espectro (animada: se excluye del fondo
+        # cacheado y se repinta por blitting)
         self.line, = self.ax.plot(np.arange(512), np.zeros(512), 
-                                 color='#36719f', linewidth=2)
+                                 color='#36719f', linewidth=2, animated=True)
+        _simplify_line_path(self.line, self.PATH_SIMPLIFY_THRESHOLD)
         
         # Configurar gradiente de colores
         self.colors = plt.cm.plasma(np.linspace(0, 1, 512))
+        
+        # Tabla de colores para la línea (evita llamar al colormap cada frame)
+        self._plasma_lut = plt.cm.plasma(np.linspace(0, 1, 256))
+        
+        # Barras persistentes: solo se actualiza su altura en cada frame
+        self.bar_rects = self.ax.bar(range(64), np.zeros(64),
+                                     color=self.colors[::8][:64],
+                                     width=0.8)
+        for rect in self.bar_rects:
+            rect.set_animated(True)
+        
+        # Ejes polares persistentes para la vista circular (ocultos por defecto)
+        self.polar_ax = self.fig.add_subplot(111, projection='polar')
+        self.polar_ax.set_facecolor('#1a1a2e')
+        self.polar_ax.set_ylim(0, 1)
+        self.polar_ax.set_visible(False)
+        
+        # Ángulos fijos y vértices del relleno reutilizados en cada frame
+        self._angles_cached = np.linspace(0, 2*np.pi, 512, endpoint=False)
+        self._polar_xy = np.zeros((512, 2), dtype=np.float32)
+        self._polar_xy[:, 0] = self._angles_cached
+        
+        self.polar_line, = self.polar_ax.plot(self._angles_cached, np.zeros(512),
+                                              color='#36719f', linewidth=2,
+                                              animated=True)
+        _simplify_line_path(self.polar_line, self.PATH_SIMPLIFY_THRESHOLD)
+        self.polar_fill, = self.polar_ax.fill(self._angles_cached, np.zeros(512),
+                                              alpha=0.3, color='#36719f',
+                                              animated=True)
     
     def _setup_animation(self):
         """Configura la animación"""
         self.animation = None
         self.animation_interval = 50  # 20 FPS
+        
+        # Función de dibujo por tipo de visualización
+        self._draw_fns = {
+            "Espectro": self._draw_spectrum,
+            "Onda": self._draw_waveform,
+            "Barras": self._draw_bars,
+            "Circular": self._draw_circular,
+        }
+        self._draw_fn = self._draw_fns[self.viz_type_var.get()]
+        self.idle_interval = 250  # Sin datos nuevos o con el frame oculto
+        
+        # Se marca al recibir espectro nuevo; sin él no se recalcula el frame
+        self._dirty = True
+        self._last_artists = []
+        
+        # Pausar el timer mientras la ventana está minimizada
+        toplevel = self.winfo_toplevel()
+        toplevel.bind("<Unmap>", self._on_toplevel_unmap, add="+")
+        toplevel.bind("<Map>", self._on_toplevel_map, add="+")
+    
+    def _on_toplevel_unmap(self, event):
+        """Detiene el timer de la animación al minimizar la ventana"""
+        # Los eventos de los hijos también llegan a la ventana principal
+        if event.widget is self.winfo_toplevel() and self.animation:
+            self.animation.event_source.stop()
+    
+    def _on_toplevel_map(self, event):
+        """Reanuda el timer de la animación al restaurar la ventana"""
+        if event.widget is self.winfo_toplevel() and self.is_active and self.animation:
+            self.animation.event_source.start()
     
     def _toggle_visualizer(self):
         """Activa/desactiva el visualizador"""
@@ -109,17 +293,52 @@ class VisualizerFrame(ctk.CTkFrame):
             self.is_active = True
             self.toggle_button.configure(text="⏸ Detener")
             
-            # Iniciar animación
-            self.animation = FuncAnimation(
-                self.fig, 
-                self._update_animation,
-                interval=self.animation_interval,
-                blit=False,
-                cache_frame_data=False
-            )
+            # Ajustar ejes antes de dibujar el fondo que se cacheará
+            self._configure_axes(self.viz_type_var.get())
+            self._dirty = True
+            self._last_artists = []
             
-            # Iniciar canvas
-            self.canvas.draw()
+            if self.animation is None:
+                # Iniciar animación con blitting: FuncAnimation cachea el fondo
+                # de los ejes (y lo regenera al redimensionar) y solo repinta
+                # los artistas devueltos por cada frame. Se crea una sola vez
+                # y arranca con el primer dibujado del canvas
+                self.animation = FuncAnimation(
+                    self.fig, 
+                    self._update_animation,
+                    interval=self.animation_interval,
+                    blit=True,
+                    cache_frame_data=False
+                )
+                self.canvas.draw()
+            else:
+                # Reanudar la animación existente
+                self.canvas.draw()
+                self.animation.event_source.start()
+    
+    def _configure_axes(self, viz_type: str):
+        """Ajusta ejes, artistas visibles y función de dibujo para el tipo
+        de visualización"""
+        self._draw_fn = self._draw_fns.get(viz_type, self._draw_spectrum)
+        
+        polar = viz_type == "Circular"
+        bars = viz_type == "Barras"
+        
+        self.ax.set_visible(not polar)
+        self.polar_ax.set_visible(polar)
+        self.line.set_visible(not bars)
+        for rect in self.bar_rects:
+            rect.set_visible(bars)
+        
+        if bars:
+            self.ax.set_xlim(0, 64)
+            self.ax.set_ylim(0, 1)
+        elif viz_type == "Onda":
+            self.ax.set_xlim(0, 512)
+            self.ax.set_ylim(-0.5, 1.5)
+        else:
+            self.ax.set_xlim(0, 512)
+            self.ax.set_ylim(0, 1)
     
     def _stop_visualizer(self):
         """Detiene el visualizador"""
@@ -127,10 +346,9 @@ class VisualizerFrame(ctk.CTkFrame):
             self.is_active = False
             self.toggle_button.configure(text="▶ Activar")
             
-            # Detener animación
+            # Detener animación (se conserva para reanudarla)
             if self.animation:
                 self.animation.event_source.stop()
-                self.animation = None
             
             # Limpiar visualización
             self._clear_visualization()
@@ -140,18 +358,25 @@ class VisualizerFrame(ctk.CTkFrame):
         if not self.is_active:
             return []
         
-        viz_type = self.viz_type_var.get()
+        # Sin datos nuevos o con el widget oculto: no recalcular y bajar la
+        # frecuencia del timer hasta que vuelva a haber algo que dibujar
+        if self._last_artists and (not self._dirty or not self.winfo_viewable()):
+            self._set_interval(self.idle_interval)
+            return self._last_artists
         
-        if viz_type == "Espectro":
-            return self._draw_spectrum()
-        elif viz_type == "Onda":
-            return self._draw_waveform()
-        elif viz_type == "Barras":
-            return self._draw_bars()
-        elif viz_type == "Circular":
-            return self._draw_circular()
+        self._dirty = False
+        self._set_interval(self.animation_interval)
         
-        return []
+        artists = self._draw_fn()
+        self._last_artists = artists
+        return artists
+    
+    def _set_interval(self, interval: int):
+        """Cambia el intervalo del timer de la animación si es distinto"""
+        if self.animation is not None:
+            source = self.animation.event_source
+            if source.interval != interval:
+                source.interval = interval
     
     def _draw_spectrum(self):
         """Dibuja visualización de espectro"""
@@ -162,73 +387,92 @@ class VisualizerFrame(ctk.CTkFrame):
         self.line.set_ydata(smoothed_data)
         
         # Cambiar color basado en intensidad
-        intensity = np.mean(smoothed_data)
-        color_intensity = min(intensity * 2, 1.0)
-        color = plt.cm.plasma(color_intensity)
-        self.line.set_color(color)
+        intensity = self.spectrum_level
+        color_idx = min(int(intensity * 2 * 255), 255)
+        self.line.set_color(self._plasma_lut[color_idx])
         
         return [self.line]
     
     def _draw_waveform(self):
         """Dibuja forma de onda"""
-        # Generar forma de onda simulada basada en espectro
-        waveform = np.sin(np.linspace(0, 4*np.pi, 512)) * np.mean(self.spectrum_data)
-        noise = np.random.random(512) * 0.1 * np.mean(self.spectrum_data)
-        waveform += noise
+        if NUMBA_AVAILABLE:
+            self._rand_state = _waveform_kernel(
+                self._sin_table, self.spectrum_level,
+                self._rand_state, self._wave_out
+            )
+            self.line.set_ydata(self._wave_out)
+            return [self.line]
+        
+        # Generar forma de onda simulada basada en espectro, sobre el buffer
+        # preasignado para no crear temporales
+        level = self.spectrum_level
+        waveform = self._wave_out
+        np.multiply(self._sin_table, level, out=waveform)
+        off = self._noise_off
+        np.multiply(self._noise_pool[off:off + 512], 0.1 * level, out=self._noise_buf)
+        self._noise_off = (off + 17) % (len(self._noise_pool) - 512)
+        waveform += self._noise_buf
+        waveform += 0.5
         
-        self.line.set_ydata(waveform + 0.5)
-        self.ax.set_ylim(-0.5, 1.5)
+        self.line.set_ydata(waveform)
         
         return [self.line]
     
     def _draw_bars(self):
         """Dibuja barras de frecuencia"""
-        # Limpiar ejes
-        self.ax.clear()
-        
-        # Configurar ejes para barras
-        self.ax.set_xlim(0, 64)
-        self.ax.set_ylim(0, 1)
-        self.ax.set_facecolor('#1a1a2e')
-        
-        # Reducir datos del espectro para barras
-        bar_data = self.spectrum_data[::8][:64]  # Tomar cada 8va muestra
+        # Sumar cada grupo de 8 muestras en su banda y pasar a escala
+        # logarítmica (normalizada para que una banda llena valga 1)
+        bands = self._band_buf
+        if NUMBA_AVAILABLE:
+            _band_kernel(self.spectrum_data, bands, self._band_scale)
+        else:
+            self.spectrum_data.reshape(64, 8).sum(axis=1, out=bands)
+            np.log1p(bands, out=bands)
+            bands *= self._band_scale
         
-        # Crear barras con gradiente de color
-        bars = self.ax.bar(range(64), bar_data, 
-                          color=self.colors[::8][:64],
-                          width=0.8)
+        for rect, height in zip(self.bar_rects, bands):
+            rect.set_height(height)
         
-        return bars
+        return list(self.bar_rects)
     
     def _draw_circular(self):
         """Dibuja visualización circular"""
-        # Limpiar ejes
-        self.ax.clear()
-        
-        # Configurar para gráfico polar
-        self.ax = plt.subplot(111, projection='polar')
-        self.ax.set_facecolor('#1a1a2e')
-        
-        # Datos para círculo
-        angles = np.linspace(0, 2*np.pi, len(self.spectrum_data), endpoint=False)
+        data = self.spectrum_data
         
-        # Dibujar círculo de espectro
-        self.ax.plot(angles, self.spectrum_data, color='#36719f', linewidth=2)
-        self.ax.fill(angles, self.spectrum_data, alpha=0.3, color='#36719f')
+        # Los ángulos no cambian: solo se actualizan los radios
+        self.polar_line.set_ydata(data)
+        self._polar_xy[:, 1] = data
+        self.polar_fill.set_xy(self._polar_xy)
         
-        return []
+        return [self.polar_line, self.polar_fill]
     
     def _smooth_spectrum(self, data):
         """Suaviza los datos del espectro"""
-        if len(data) < 3:
+        if len(data) < self.SMOOTH_WINDOW:
             return data
         
-        # Aplicar filtro de media móvil simple
-        window_size = 3
-        smoothed = np.convolve(data, np.ones(window_size)/window_size, mode='same')
+        if len(data) != len(self._smooth_out):
+            self._smooth_cumsum = np.zeros(len(data) + 1, dtype=np.float32)
+            self._smooth_out = np.empty(len(data), dtype=np.float32)
         
-        return smoothed
+        if NUMBA_AVAILABLE and data.dtype == np.float32:
+            _smooth_kernel(data, self.SMOOTH_WINDOW, self._smooth_out)
+            return self._smooth_out
+        
+        # Media móvil por suma acumulada: una pasada y sin temporales
+        w = self.SMOOTH_WINDOW
+        h = w // 2
+        c = self._smooth_cumsum
+        out = self._smooth_out
+        np.cumsum(data, out=c[1:])
+        np.subtract(c[w:], c[:-w], out=out[h:len(data) - h])
+        out[h:len(data) - h] *= 1.0 / w
+        
+        # Los extremos conservan el valor original
+        out[:h] = data[:h]
+        out[len(data) - h:] = data[len(data) - h:]
+        
+        return out
     
     def _clear_visualization(self):
         """Limpia la visualización"""
@@ -238,21 +482,46 @@ class VisualizerFrame(ctk.CTkFrame):
     def _on_viz_type_change(self, viz_type):
         """Evento cuando cambia el tipo de visualización"""
         if self.is_active:
-            # Reiniciar visualización con nuevo tipo
-            self._stop_visualizer()
-            self._start_visualizer()
+            # Cambiar ejes/artistas sin recrear la animación y redibujar el
+            # fondo que se usará para el blitting
+            self._configure_axes(viz_type)
+            self._dirty = True
+            self._last_artists = []
+            self.canvas.draw()
     
     def update_spectrum(self, spectrum_data):
         """Actualiza los datos del espectro"""
-        if spectrum_data is not None and len(spectrum_data) > 0:
-            # Normalizar datos
-            max_val = np.max(spectrum_data)
-            if max_val > 0:
-                self.spectrum_data = spectrum_data / max_val
-            else:
-                self.spectrum_data = spectrum_data
+        # Se escribe sobre el buffer trasero para no asignar memoria en cada
+        # llamada del hilo de audio ni modificar el que se está dibujando
+        write_idx = 1 - self._read_idx
+        buf = self._buffers[write_idx]
+        if spectrum_data is None or len(spectrum_data) == 0:
+            buf.fill(0.0)
+            self._levels[write_idx] = 0.0
+            self._read_idx = write_idx
+            self._dirty = True
+            return
+        
+        data = np.asarray(spectrum_data, dtype=buf.dtype)
+        n = min(len(data), len(buf))
+        target = buf[:n]
+        
+        # Normalizar datos
+        if NUMBA_AVAILABLE:
+            total = _normalize_kernel(data[:n], target)
         else:
-            self.spectrum_data = np.zeros(512)
+            np.copyto(target, data[:n])
+            max_val = target.max()
+            if max_val > 0:
+                np.divide(target, max_val, out=target)
+            total = target.sum()
+        
+        buf[n:] = 0.0
+        self._levels[write_idx] = float(total) / len(buf)
+        
+        # Publicar el buffer recién escrito
+        self._read_idx = write_idx
+        self._dirty = True
     
     def start_visualization(self):
         """Inicia la visualización externamente"""
@@ -267,5 +536,23 @@ class VisualizerFrame(ctk.CTkFrame):
     def cleanup(self):
         """Limpia recursos del visualizador"""
         self._stop_visualizer()
-        if hasattr(self, 'fig'):
+        
+        # Soltar la animación (y con ella su caché de fondos del blitting)
+        if self.animation:
+            self.animation.event_source.stop()
+            self.animation = None
+        self._last_artists = []
+        
+        # Destruir el canvas libera el buffer de Agg y la imagen de Tk
+        if getattr(self, 'canvas', None) is not None:
+            self.canvas.get_tk_widget().destroy()
+            self.canvas = None
+        
+        if getattr(self, 'fig', None) is not None:
             plt.close(self.fig)
+            self.fig = None
+        
+        self.line = None
+        self.bar_rects = None
+        self.polar_line = None
+        self.polar_fill = None
@@ -6,7 +6,24 @@ Widget para controlar el volumen con slider y botón de mute
 """
 
 import customtkinter as ctk
-from typing import Callable
+import tkinter as tk
+from typing import Callable, Optional
+
+from .fonts import get_font
+
+# Íconos del botón de mute según el nivel de volumen
+_ICON_MUTE = "🔇"
+_ICON_LOW = "🔈"
+_ICON_MID = "🔉"
+_ICON_HIGH = "🔊"
+
+# Ícono para cada volumen 0-100: 0 silencio, <30 bajo, <70 medio, resto alto
+_ICON_TABLE = (_ICON_MUTE,) + (_ICON_LOW,) * 29 + (_ICON_MID,) * 40 + (_ICON_HIGH,) * 31
+
+# Texto del label para cada volumen 0-100
+_VOL_LABELS = tuple(f"{i}%" for i in range(101))
+
+_MUTED_COLOR = "#f44336"
 
 class VolumeControl(ctk.CTkFrame):
     """Widget de control de volumen"""
@@ -19,6 +36,18 @@ class VolumeControl(ctk.CTkFrame):
         self.muted = False
         self.volume_before_mute = 70
         
+        # Cambios del slider pendientes de aplicar (como máximo uno por frame)
+        self._pending_volume = None
+        self._pending_after_id = None
+        
+        # True mientras el slider se mueve desde set_volume (no es del usuario)
+        self._updating_from_backend = False
+        
+        # Último estado aplicado a cada widget, para no repetir configure()
+        self._last_icon = _ICON_HIGH
+        self._last_fg_color = None
+        self._last_label_text = _VOL_LABELS[self.current_volume]
+        
         self._create_controls()
     
     def _create_controls(self):
@@ -27,10 +56,10 @@ class VolumeControl(ctk.CTkFrame):
         # Botón de mute
         self.mute_button = ctk.CTkButton(
             self,
-            text="🔊",
+            text=_ICON_HIGH,
             width=40,
             height=40,
-            font=ctk.CTkFont(size=16),
+            font=get_font(16),
             command=self._toggle_mute
         )
         self.mute_button.pack(side="left", padx=(10, 5))
@@ -46,17 +75,29 @@ class VolumeControl(ctk.CTkFrame):
         self.volume_slider.pack(side="left", padx=5)
         self.volume_slider.set(self.current_volume)
         
-        # Label de volumen
+        # Label de volumen (ligado a una variable: actualizar no reconfigura el widget)
+        self._label_var = tk.StringVar(master=self, value=self._last_label_text)
         self.volume_label = ctk.CTkLabel(
             self,
-            text=f"{self.current_volume}%",
+            textvariable=self._label_var,
             width=40
         )
         self.volume_label.pack(side="left", padx=(5, 10))
     
     def _on_volume_change(self, value):
         """Callback cuando cambia el volumen"""
-        volume = int(value)
+        if self._updating_from_backend:
+            return
+        
+        # Agrupar los eventos del arrastre: solo se aplica el último valor
+        self._pending_volume = int(value)
+        if self._pending_after_id is None:
+            self._pending_after_id = self.after(16, self._flush_volume)
+    
+    def _flush_volume(self):
+        """Aplica el último volumen recibido del slider"""
+        self._pending_after_id = None
+        volume = self._pending_volume
         self.current_volume = volume
         
         # Actualizar UI
@@ -72,48 +113,78 @@ class VolumeControl(ctk.CTkFrame):
     
     def _toggle_mute(self):
         """Alterna entre mute y unmute"""
+        self._cancel_pending_volume()
+        
+        # Calcular el estado final y aplicarlo con un configure por widget
         if self.muted:
             # Unmute: restaurar volumen anterior
             self.muted = False
-            self.volume_slider.set(self.volume_before_mute)
-            self.current_volume = self.volume_before_mute
-            self.volume_callback(self.current_volume)
+            volume = self.volume_before_mute
+            icon = _ICON_TABLE[volume]
+            fg_color = "transparent"
         else:
             # Mute: guardar volumen actual y poner a 0
             self.muted = True
             self.volume_before_mute = self.current_volume
-            self.volume_slider.set(0)
-            self.current_volume = 0
-            self.volume_callback(0)
+            volume = 0
+            icon = _ICON_MUTE
+            fg_color = _MUTED_COLOR
         
-        self._update_mute_button()
-        self._update_volume_display(self.current_volume)
+        self.current_volume = volume
+        self.volume_slider.set(volume)
+        self._configure_mute_button(icon, fg_color)
+        self._configure_label(_VOL_LABELS[volume])
+        self.volume_callback(volume)
+    
+    def _cancel_pending_volume(self):
+        """Descarta un cambio del slider aún no aplicado"""
+        if self._pending_after_id is not None:
+            self.after_cancel(self._pending_after_id)
+            self._pending_after_id = None
     
     def _update_mute_button(self):
         """Actualiza el ícono del botón de mute"""
         if self.muted:
-            self.mute_button.configure(text="🔇", fg_color="#f44336")
+            self._configure_mute_button(_ICON_MUTE, _MUTED_COLOR)
         else:
-            self.mute_button.configure(text="🔊", fg_color="transparent")
+            self._configure_mute_button(_ICON_HIGH, "transparent")
     
     def _update_volume_display(self, volume):
         """Actualiza la visualización del volumen"""
-        self.volume_label.configure(text=f"{volume}%")
+        self._configure_label(_VOL_LABELS[volume])
         
         # Cambiar ícono según nivel de volumen
         if not self.muted:
-            if volume == 0:
-                self.mute_button.configure(text="🔇")
-            elif volume < 30:
-                self.mute_button.configure(text="🔈")
-            elif volume < 70:
-                self.mute_button.configure(text="🔉")
-            else:
-                self.mute_button.configure(text="🔊")
+            self._configure_mute_button(_ICON_TABLE[volume])
+    
+    def _configure_mute_button(self, icon: str, fg_color: Optional[str] = None):
+        """Configura el botón de mute solo con lo que haya cambiado"""
+        changes = {}
+        if icon != self._last_icon:
+            changes["text"] = icon
+            self._last_icon = icon
+        if fg_color is not None and fg_color != self._last_fg_color:
+            changes["fg_color"] = fg_color
+            self._last_fg_color = fg_color
+        if changes:
+            self.mute_button.configure(**changes)
+    
+    def _configure_label(self, text: str):
+        """Actualiza el texto del volumen solo si cambió"""
+        if text != self._last_label_text:
+            self._last_label_text = text
+            self._label_var.set(text)
     
     def set_volume(self, volume: int):
         """Establece el volumen externamente"""
         volume = max(0, min(100, volume))
+        if volume == self.current_volume and not self.muted:
+            return
+        
         self.current_volume = volume
-        self.volume_slider.set(volume)
+        self._updating_from_backend = True
+        try:
+            self.volume_slider.set(volume)
+        finally:
+            self._updating_from_backend = False
         self._update_volume_display(volume)
@@ -15,6 +15,12 @@ from flask import Flask, render_template, jsonify, request, send_from_directory
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
 
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
 from ..core.app import MusicPlayerProApp
 from ..core.config_manager import get_config_manager
 
@@ -922,8 +928,15 @@ class MusicPlayerWebApp:
             update_thread.start()
             logger.info("Bucle de actualizaciones en segundo plano iniciado")
             
-            # Ejecutar Flask con SocketIO
-            self.socketio.run(self.app, host=host, port=port, debug=debug, allow_unsafe_werkzeug=True)
+            if WAITRESS_AVAILABLE and not debug:
+                # Servidor WSGI de producción con pool de hilos. SocketIO envuelve
+                # app.wsgi_app, así que los clientes Socket.IO siguen funcionando
+                # (por long-polling; el servidor no emite eventos propios)
+                logger.info("Servidor WSGI: waitress")
+                serve(self.app, host=host, port=port, threads=8)
+            else:
+                # Ejecutar Flask con SocketIO (servidor de desarrollo de Werkzeug)
+                self.socketio.run(self.app, host=host, port=port, debug=debug, allow_unsafe_werkzeug=True)
         except Exception as e:
             logger.error(f"Error al iniciar servidor: {e}")
             raise
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 CONFTEST - UTILIDADES COMPARTIDAS DE LAS PRUEBAS
+==================================================
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# Importar como lo hace main.py: ``src.core.app``, ``src.audio.vlc_engine``...
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_on_temp_loop(coro_fn, timeout: float = 5.0):
+    """Ejecuta ``coro_fn()`` como MusicPlayerWebApp._execute_async_method
+
+    Un hilo nuevo crea su propio event loop, corre la corrutina hasta el
+    final y cierra el loop; todo lo que quede pendiente en él se pierde.
+    """
+    result = {}
+
+    def worker():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            result['value'] = loop.run_until_complete(coro_fn())
+        except BaseException as e:
+            result['error'] = e
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "la corrutina no terminó a tiempo"
+    if 'error' in result:
+        raise result['error']
+    return result.get('value')
+
+
+@pytest.fixture
+def temp_loop_runner():
+    return run_on_temp_loop
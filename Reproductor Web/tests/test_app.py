@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 PRUEBAS DE MusicPlayerProApp
+==============================
+Caminos async llamados desde loops temporales (como las peticiones de
+Flask), búsqueda en la biblioteca, modo aleatorio y modos de repetición.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.core.app import MusicPlayerProApp, PlaybackState, Track
+from src.core.database import DatabaseManager
+
+
+class FakeAudioEngine:
+    """Motor de audio mínimo que registra las llamadas recibidas"""
+
+    def __init__(self, metadata_timeout: bool = False):
+        self.volumes = []
+        self.loaded = []
+        self.metadata_timeout = metadata_timeout
+
+    async def set_volume_async(self, volume):
+        self.volumes.append(volume)
+
+    async def load_track(self, path):
+        self.loaded.append(path)
+        return True
+
+    async def play_async(self):
+        pass
+
+    async def stop_async(self):
+        pass
+
+    async def wait_for_metadata(self, timeout: float = 1.0):
+        if self.metadata_timeout:
+            raise asyncio.TimeoutError
+
+    async def get_duration(self):
+        return 180.0
+
+
+class FakeVisualManager:
+    async def start_visualization(self):
+        pass
+
+    async def stop_visualization(self):
+        pass
+
+
+def make_track(i, path="", **fields):
+    data = dict(id=str(i), title=f"Song {i}", artist=f"Artist {i}",
+                album=f"Album {i}", path=path or f"/music/{i}.mp3", duration=0.0)
+    data.update(fields)
+    return Track(**data)
+
+
+def make_app(engine=None, db=None):
+    return MusicPlayerProApp(None, db, engine or FakeAudioEngine(),
+                             FakeVisualManager(), None)
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "library.db"))
+    asyncio.run(manager.initialize())
+    yield manager
+    manager.connection.close()
+
+
+def play_history_count(db):
+    return db.connection.execute("SELECT COUNT(*) FROM play_history").fetchone()[0]
+
+
+# --- set_volume ---------------------------------------------------------------
+
+def test_set_volume_reaches_engine_from_temporary_loop(temp_loop_runner):
+    app = make_app()
+    emitted = []
+    app.register_callback('volume_changed', emitted.append)
+
+    temp_loop_runner(lambda: app.set_volume(40))
+
+    assert app.volume == 40
+    assert app.audio_engine.volumes == [40]
+    assert emitted == [40]
+
+
+def test_set_volume_clamps():
+    app = make_app()
+    asyncio.run(app.set_volume(150))
+    asyncio.run(app.set_volume(-5))
+    assert app.audio_engine.volumes == [100, 0]
+
+
+def test_set_volume_through_flask_execute_async_method():
+    flask_app = pytest.importorskip("src.web.flask_app")
+    app = make_app()
+
+    flask_app.MusicPlayerWebApp._execute_async_method(None, lambda: app.set_volume(55))
+
+    deadline = time.monotonic() + 2.0
+    while not app.audio_engine.volumes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert app.audio_engine.volumes == [55]
+
+
+# --- play_track ---------------------------------------------------------------
+
+def test_play_track_from_different_loops(tmp_path, db, temp_loop_runner):
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"{i}.mp3"
+        path.write_bytes(b"")
+        paths.append(str(path))
+    tracks = [make_track(i, path=p) for i, p in enumerate(paths)]
+
+    app = make_app(db=db)
+    app.music_library = tracks
+    changed = []
+    app.register_callback('track_changed', changed.append)
+
+    # Cada petición de Flask corre en un loop propio que se cierra al terminar
+    temp_loop_runner(lambda: app.play_track(tracks[0]))
+    temp_loop_runner(lambda: app.play_track(tracks[1]))
+
+    assert app.playback_state == PlaybackState.PLAYING
+    assert app.audio_engine.loaded == paths
+    assert changed == tracks
+    assert app.current_index == 1
+    assert app.duration == 180.0
+    # El historial se escribió antes de que se cerrara cada loop
+    assert play_history_count(db) == 2
+
+
+def test_play_track_continues_when_metadata_times_out(tmp_path, db):
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"")
+    track = make_track(1, path=str(path))
+
+    app = make_app(engine=FakeAudioEngine(metadata_timeout=True), db=db)
+    changed = []
+    app.register_callback('track_changed', changed.append)
+
+    asyncio.run(app.play_track(track))
+
+    assert app.playback_state == PlaybackState.PLAYING
+    assert changed == [track]
+
+
+def test_add_play_history_runs_off_the_loop_thread(db, monkeypatch):
+    threads = []
+    insert = db._add_play_history_sync
+
+    def recording_insert(track_id):
+        threads.append(threading.get_ident())
+        insert(track_id)
+
+    monkeypatch.setattr(db, "_add_play_history_sync", recording_insert)
+
+    async def main():
+        await db.add_play_history("1")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+
+    assert threads and threads[0] != loop_thread
+    assert play_history_count(db) == 1
+
+
+# --- Lote de eventos de play_track -------------------------------------------
+
+class RecordingDB:
+    """Base de datos falsa que anota qué eventos ya se habían emitido"""
+
+    def __init__(self, events):
+        self.events = events
+        self.seen_at_insert = None
+
+    async def add_play_history(self, track_id):
+        self.seen_at_insert = list(self.events)
+
+
+def test_play_track_batch_only_holds_its_own_events(tmp_path):
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"")
+    track = make_track(1, path=str(path))
+    events = []
+    seen_during_load = []
+
+    class ThreadedEngine(FakeAudioEngine):
+        async def load_track(self, path):
+            # El hilo de VLC notifica la posición mientras el lote está abierto
+            t = threading.Thread(target=app._on_position_update, args=(5.0, 100.0))
+            t.start()
+            t.join()
+            seen_during_load.extend(events)
+            return await super().load_track(path)
+
+    db = RecordingDB(events)
+    app = make_app(engine=ThreadedEngine(), db=db)
+    for name in ('position_changed', 'playback_state_changed', 'track_changed'):
+        app.register_callback(name, lambda data, name=name: events.append(name))
+
+    asyncio.run(app.play_track(track))
+
+    # La posición de otro hilo no espera a que termine la carga
+    assert seen_during_load == ['position_changed']
+    # Los eventos propios salen juntos (LOADING se colapsa en PLAYING)
+    assert events == ['position_changed', 'playback_state_changed', 'track_changed']
+    assert app.playback_state == PlaybackState.PLAYING
+    # La UI ya está notificada cuando se escribe el historial
+    assert db.seen_at_insert == events
+
+
+# --- Búsqueda -----------------------------------------------------------------
+
+@pytest.fixture
+def library_app():
+    app = make_app()
+    app.music_library = [
+        make_track(0, title="Hello World", artist="Alpha", album="First"),
+        make_track(1, title="Goodbye", artist="Beta", album="World Tour"),
+        make_track(2, title="Other", artist="Gamma", album="Third"),
+        make_track(3, title="World", artist="World", album="World"),
+    ]
+    app._build_library_index()
+    return app
+
+
+def search(app, query):
+    return [t.id for t in asyncio.run(app.search_tracks(query))]
+
+
+def test_search_matches_each_track_once(library_app):
+    assert search(library_app, "world") == ["0", "1", "3"]
+
+
+def test_search_is_case_insensitive_and_matches_last_track(library_app):
+    assert search(library_app, "GAMMA") == ["2"]
+    assert search(library_app, "third") == ["2"]
+
+
+def test_search_does_not_match_across_tracks(library_app):
+    # "First" termina una pista y "Goodbye" empieza la siguiente
+    assert search(library_app, "firstgoodbye") == []
+    assert search(library_app, "first\0goodbye") == []
+
+
+def test_search_empty_query_returns_library(library_app):
+    assert search(library_app, "") == ["0", "1", "2", "3"]
+
+
+def test_search_without_matches(library_app):
+    assert search(library_app, "zzz") == []
+
+
+# --- Modo aleatorio -----------------------------------------------------------
+
+def test_shuffle_does_not_repeat_within_a_cycle():
+    app = make_app()
+    app.current_index = 0
+    app._reset_shuffle(5)
+    seen = []
+    for _ in range(4):
+        index = app._next_shuffle_index(5)
+        assert index != app.current_index
+        app.current_index = index
+        seen.append(index)
+
+    assert len(set(seen)) == 4
+    assert all(0 <= i < 5 for i in seen)
+
+
+def test_shuffle_previous_walks_back_through_history():
+    app = make_app()
+    app.current_index = 0
+    played = [0]
+    for _ in range(3):
+        app.current_index = app._next_shuffle_index(6)
+        played.append(app.current_index)
+
+    for expected in reversed(played[:-1]):
+        app.current_index = app._previous_shuffle_index(6)
+        assert app.current_index == expected
+
+
+def test_shuffle_previous_without_history_avoids_current():
+    app = make_app()
+    app.current_index = 2
+    for _ in range(50):
+        assert app._previous_shuffle_index(3) != 2
+
+
+def test_shuffle_regenerates_when_playlist_size_changes():
+    app = make_app()
+    app.current_index = 0
+    app._next_shuffle_index(10)
+    index = app._next_shuffle_index(3)
+    assert 0 <= index < 3
+    assert app._shuffle_len == 3
+
+
+# --- Repetición ---------------------------------------------------------------
+
+def test_cycle_repeat_mode():
+    app = make_app()
+    assert [app.cycle_repeat_mode() for _ in range(4)] == ["one", "all", "none", "one"]
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 PRUEBAS DE ConfigManager
+==========================
+Guardado condicional, escritura atómica, vista plana de get/set y uso
+desde varios loops a la vez.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+
+import pytest
+
+from src.core import config_manager as cm
+from src.core.config_manager import ConfigManager
+
+
+@pytest.fixture
+def config(tmp_path):
+    manager = ConfigManager(str(tmp_path / "config"))
+    manager.config_dir.mkdir()
+    asyncio.run(manager.load_config())  # Crea el archivo por defecto
+    return manager
+
+
+def read_file(manager):
+    return json.loads(manager.config_file.read_bytes())
+
+
+def test_write_atomic_replaces_file_without_leftovers(tmp_path):
+    target = tmp_path / "app_config.json"
+    target.write_bytes(b"old")
+
+    cm._write_atomic(target, b'{"a": 1}')
+
+    assert target.read_bytes() == b'{"a": 1}'
+    assert [p.name for p in tmp_path.iterdir()] == ["app_config.json"]
+
+
+def test_save_persists_direct_dataclass_edits(config):
+    config.audio.volume = 33
+    asyncio.run(config.save_config())
+
+    assert read_file(config)["audio"]["volume"] == 33
+
+
+def test_save_skips_write_without_changes(config):
+    before = config.config_file.stat().st_mtime_ns
+    asyncio.run(config.save_config())
+    assert config.config_file.stat().st_mtime_ns == before
+
+
+def test_failed_write_is_retried(config, monkeypatch):
+    def failing_write(path, payload):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(cm, "_write_atomic", failing_write)
+    config.set("custom.flag", True)
+    asyncio.run(config.save_config())
+    assert "custom" not in read_file(config)
+
+    monkeypatch.undo()
+    asyncio.run(config.save_config())
+    assert read_file(config)["custom"] == {"flag": True}
+
+
+def test_save_converts_only_dirty_sections(config, monkeypatch):
+    converted = []
+    asdict = cm.asdict
+
+    def recording_asdict(obj):
+        converted.append(type(obj).__name__)
+        return asdict(obj)
+
+    monkeypatch.setattr(cm, "asdict", recording_asdict)
+
+    asyncio.run(config.save_config())
+    assert converted == []
+
+    config.ui.font_size = 14
+    asyncio.run(config.save_config())
+    assert converted == ["UIConfig"]
+    assert read_file(config)["ui"]["font_size"] == 14
+
+
+def test_loaded_sections_track_edits(config):
+    asyncio.run(config.load_config())  # Secciones nuevas leídas del archivo
+    config.network.remote_port = 9090
+    asyncio.run(config.save_config())
+
+    assert read_file(config)["network"]["remote_port"] == 9090
+
+
+def test_flat_get_set(config):
+    config.set("custom.a.b", 1)
+    assert config.get("custom.a.b") == 1
+    assert config.get("custom.a") == {"b": 1}
+
+    # Reemplazar un subárbol descarta las rutas del valor anterior
+    config.set("custom.a", {"c": 2})
+    assert config.get("custom.a.b") is None
+    assert config.get("custom.a.c") == 2
+    assert config.get("missing.key", "default") == "default"
+
+
+def test_save_from_several_loops(config, caplog):
+    errors = []
+
+    def worker(volume):
+        try:
+            config.audio.volume = volume
+            asyncio.run(config.save_config(force=True))
+        except Exception as e:  # pragma: no cover - solo para el informe
+            errors.append(e)
+
+    with caplog.at_level(logging.ERROR, logger=cm.__name__):
+        threads = [threading.Thread(target=worker, args=(v,), daemon=True)
+                   for v in range(10, 60, 10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+
+    # Un lock ligado a un loop deja colgados a los guardados de los demás
+    assert not any(t.is_alive() for t in threads)
+    assert not errors
+    assert not [r for r in caplog.records if "guardando" in r.getMessage()]
+    assert read_file(config)["audio"]["volume"] in range(10, 60, 10)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 PRUEBAS DE VLCAudioEngine
+===========================
+Espera de metadatos desde distintos event loops y contrato de las copias
+del espectro. Requieren numpy y python-vlc.
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("vlc")
+
+from src.audio.vlc_engine import VLCAudioEngine
+
+
+@pytest.fixture
+def engine():
+    engine = VLCAudioEngine()
+    yield engine
+    engine._exec.shutdown(wait=False)
+
+
+def length_event(ms):
+    return SimpleNamespace(u=SimpleNamespace(new_length=ms))
+
+
+def test_wait_for_metadata_wakes_waiters_on_any_loop(engine, temp_loop_runner):
+    for length in (5000, 7000):
+        engine._metadata_ready.clear()
+        # El hilo de VLC notifica la duración mientras otro loop espera
+        threading.Timer(0.05, engine._on_length_changed, args=(length_event(length),)).start()
+
+        start = time.monotonic()
+        temp_loop_runner(lambda: engine.wait_for_metadata(timeout=2.0))
+
+        assert time.monotonic() - start < 1.0
+        assert engine.duration == length / 1000.0
+
+
+def test_wait_for_metadata_times_out_on_a_second_loop(engine, temp_loop_runner):
+    temp_loop_runner(lambda: engine.wait_for_metadata(timeout=0.05))  # Ya está listo
+
+    engine._metadata_ready.clear()
+    with pytest.raises(asyncio.TimeoutError):
+        temp_loop_runner(lambda: engine.wait_for_metadata(timeout=0.05))
+
+
+def test_get_spectrum_data_returns_independent_copy(engine):
+    data = engine.get_spectrum_data()
+    data[:] = 1.0  # Escribible y sin tocar el anillo
+
+    assert not engine.spectrum_data.any()